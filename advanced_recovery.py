@@ -18,15 +18,51 @@ import os
 import sqlite3
 import json
 import binascii
+import fnmatch
+import functools
+from importlib.metadata import version
 from pathlib import Path
 from bitcoinlib.wallets import Wallet, wallet_exists, wallets_list
 from bitcoinlib.keys import HDKey
 from bitcoinlib.services.services import Service
 from bitcoinlib.transactions import Transaction
 
+# Transaction ID attribute: 'txid' from bitcoinlib 0.6 on, 'hash' before
+try:
+    TX_ID_ATTR = 'txid' if tuple(map(int, version('bitcoinlib').split('.')[:2])) >= (0, 6) else 'hash'
+except Exception:
+    TX_ID_ATTR = 'txid'
+
+def _find_database(root_dir):
+    """
+    Walk a bitcoinlib install directory looking for its SQLite database
+    """
+    try:
+        entries = list(os.scandir(root_dir))
+    except OSError:
+        return None
+    
+    for entry in entries:
+        if entry.is_file() and fnmatch.fnmatch(entry.name, "*bitcoinlib*.sqlite"):
+            return Path(entry.path)
+    
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            path = _find_database(entry.path)
+            if path:
+                return path
+    
+    return None
+
 # Determine database path
+@functools.lru_cache(maxsize=1)
 def get_database_path():
     """Get the path to the bitcoinlib database file"""
+    # Explicit override, skips all filesystem probing
+    env_db_path = os.environ.get("BITCOINLIB_DB")
+    if env_db_path:
+        return Path(env_db_path)
+    
     home_dir = Path.home()
     default_db_path = home_dir / ".bitcoinlib" / "database" / "bitcoinlib.sqlite"
     if os.path.exists(default_db_path):
@@ -37,13 +73,88 @@ def get_database_path():
     if os.path.exists(windows_db_path):
         return windows_db_path
     
-    # Try to find by searching
-    for root_dir in [home_dir, Path(os.getenv('APPDATA', ''))]:
-        for path in root_dir.glob("**/*bitcoinlib*.sqlite"):
+    # Try to find by searching the known bitcoinlib install roots only
+    search_roots = [home_dir / ".bitcoinlib"]
+    if os.getenv('APPDATA'):
+        search_roots.append(Path(os.getenv('APPDATA')) / "bitcoinlib")
+    for root_dir in search_roots:
+        path = _find_database(root_dir)
+        if path:
             return path
     
     return None
 
+def _open_db(db_path):
+    """
+    Open the bitcoinlib database read-only, with PRAGMAs tuned for lookups
+    """
+    conn = sqlite3.connect(f"{Path(db_path).as_uri()}?mode=ro", uri=True, isolation_level=None)
+    conn.executescript(
+        "PRAGMA cache_size=-20000;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA mmap_size=268435456;"
+    )
+    return conn
+
+# Connection shared by all recovery methods, opened on first use
+_CONN = None
+
+def _get_connection(db_path):
+    """
+    Return the session-wide database connection, opening it on first use
+    """
+    global _CONN
+    if _CONN is None:
+        _CONN = _open_db(db_path)
+    return _CONN
+
+def _get_wallet_id(conn, wallet_name):
+    """
+    Look up a wallet's id by name, or None if it doesn't exist
+    """
+    row = conn.execute("SELECT id FROM wallets WHERE name=?", (wallet_name,)).fetchone()
+    return row[0] if row else None
+
+@functools.lru_cache(maxsize=4)
+def _keys_columns(db_path):
+    """
+    Column names of the keys table; the schema doesn't change while we run
+    """
+    conn = sqlite3.connect(f"{Path(db_path).as_uri()}?mode=ro", uri=True)
+    try:
+        return frozenset(col[1] for col in conn.execute("PRAGMA table_info(keys)"))
+    finally:
+        conn.close()
+
+# SQL for the single keys/wallets lookup, keyed by the set of columns in the keys table
+_SEED_QUERY_CACHE = {}
+
+# Paths bitcoinlib has used for the master key row
+MASTER_PATH_SQL = "(k.path IN ('m', '') OR k.path IS NULL)"
+
+def _build_seed_query(columns):
+    """
+    Build (once per column set) the JOIN query used by extract_wallet_seed.
+    Rows are: wallet id, key count, the key columns, seed, is-master flag;
+    master keys sort first so callers can stop reading early.
+    """
+    key_columns = frozenset(columns)
+    query = _SEED_QUERY_CACHE.get(key_columns)
+    if query is None:
+        seed_column = 'seed_hex' if 'seed_hex' in key_columns else ('seed' if 'seed' in key_columns else None)
+        select_columns = []
+        for col in ['id', 'path', 'address', 'wif', 'public', 'private', 'is_private']:
+            select_columns.append(f"k.{col}" if col in key_columns else "NULL")
+        select_columns.append(f"k.{seed_column}" if seed_column else "NULL")
+        query = (
+            f"SELECT w.id, COUNT(k.id) OVER (), {', '.join(select_columns)}, "
+            f"{MASTER_PATH_SQL} AS is_master FROM wallets w "
+            "LEFT JOIN keys k ON k.wallet_id = w.id WHERE w.name=? "
+            "ORDER BY is_master DESC, k.id"
+        )
+        _SEED_QUERY_CACHE[key_columns] = query
+    return query
+
 def extract_wallet_seed(wallet_name):
     """
     Attempt to extract the HD wallet seed phrase or mnemonic
@@ -57,72 +168,62 @@ def extract_wallet_seed(wallet_name):
     
     try:
         # Connect to SQLite database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        conn = _get_connection(db_path)
         
         # First, check the schema to see what columns are available
-        cursor.execute("PRAGMA table_info(keys)")
-        columns = [col[1] for col in cursor.fetchall()]
+        columns = _keys_columns(db_path)
         
         # Look for potential seed columns
-        seed_columns = [col for col in columns if 'seed' in col.lower()]
+        seed_columns = sorted(col for col in columns if 'seed' in col.lower())
         print(f"Found potential seed columns: {seed_columns}")
         
-        # Try different approaches based on available columns
-        wallet_data = None
-        if 'seed_hex' in columns:
-            cursor.execute(
-                "SELECT seed_hex, wallet_id FROM keys WHERE wallet_id IN "
-                "(SELECT id FROM wallets WHERE name=?)", 
-                (wallet_name,)
-            )
-            wallet_data = cursor.fetchone()
-        elif 'seed' in columns:
-            cursor.execute(
-                "SELECT seed, wallet_id FROM keys WHERE wallet_id IN "
-                "(SELECT id FROM wallets WHERE name=?)", 
-                (wallet_name,)
-            )
-            wallet_data = cursor.fetchone()
+        # Stream the wallet's keys (master keys first) in one round-trip,
+        # keeping only the master rows and the first 10 keys for display
+        wallet_id = None
+        key_count = 0
+        master_rows = []
+        keys = []
+        cursor = conn.execute(_build_seed_query(columns), (wallet_name,))
+        for row in cursor:
+            wallet_id, key_count = row[0], row[1]
+            # The LEFT JOIN yields a NULL key id when the wallet has no keys
+            if row[2] is None:
+                break
+            if row[10]:
+                master_rows.append(row[2:10])
+            elif len(keys) >= 10:
+                break
+            if len(keys) < 10:
+                keys.append(row[2:10])
+        # Release the statement now, we may have stopped reading early
+        cursor.close()
+        
+        # Seed column from the first key, if the schema has one
+        wallet_data = (keys[0][7],) if keys else None
         
         # Check for private master key
         master_key_data = None
         if 'private' in columns and 'is_private' in columns:
-            cursor.execute(
-                "SELECT private, wallet_id FROM keys WHERE wallet_id IN "
-                "(SELECT id FROM wallets WHERE name=?) AND is_private=1 AND (path='m' OR path='' OR path IS NULL) LIMIT 1", 
-                (wallet_name,)
+            master_key_data = next(
+                ((row[5],) for row in master_rows if row[6] == 1), None
             )
-            master_key_data = cursor.fetchone()
         
         # Show wallet structure
         print("\nExamining wallet database structure...")
         print(f"Wallet name: {wallet_name}")
         
-        # Get wallet ID
-        cursor.execute("SELECT id FROM wallets WHERE name=?", (wallet_name,))
-        wallet_id_data = cursor.fetchone()
-        
-        if wallet_id_data:
-            wallet_id = wallet_id_data[0]
+        if wallet_id is not None:
             print(f"Wallet ID: {wallet_id}")
             
             # Count keys
-            cursor.execute("SELECT COUNT(*) FROM keys WHERE wallet_id=?", (wallet_id,))
-            key_count = cursor.fetchone()[0]
             print(f"Number of keys: {key_count}")
             
             # Get master key info
-            cursor.execute(
-                "SELECT id, path, address, public, private, is_private FROM keys "
-                "WHERE wallet_id=? AND (path='m' OR path='' OR path IS NULL) LIMIT 1", 
-                (wallet_id,)
-            )
-            master_key_row = cursor.fetchone()
+            master_key_row = master_rows[0] if master_rows else None
             
             if master_key_row:
                 print("\nMaster key found:")
-                id, path, address, public, private, is_private = master_key_row
+                id, path, address, wif, public, private, is_private, seed = master_key_row
                 print(f"ID: {id}")
                 print(f"Path: {path}")
                 print(f"Address: {address}")
@@ -155,17 +256,11 @@ def extract_wallet_seed(wallet_name):
         
         # Dump important tables to inspect structure
         print("\nExporting keys to human-readable format...")
-        cursor.execute(
-            "SELECT id, path, address, wif, public, private, is_private FROM keys "
-            "WHERE wallet_id IN (SELECT id FROM wallets WHERE name=?) LIMIT 10", 
-            (wallet_name,)
-        )
-        keys = cursor.fetchall()
         
         if keys:
             print("\nKey information:")
             for key in keys:
-                key_id, path, address, wif, public, private, is_private = key
+                key_id, path, address, wif, public, private, is_private, seed = key
                 print(f"\nKey ID: {key_id}")
                 print(f"Path: {path}")
                 print(f"Address: {address}")
@@ -174,8 +269,6 @@ def extract_wallet_seed(wallet_name):
                     print(f"WIF: {wif}")
                     print("↑ This private key can be imported into Electrum")
         
-        conn.close()
-        
         # If we found a private key, that's success
         if master_key_data and master_key_data[0]:
             return master_key_data[0]
@@ -196,14 +289,41 @@ def extract_master_key(wallet_name):
     print("\n=== ATTEMPTING TO EXTRACT MASTER PRIVATE KEY ===")
     
     try:
+        # Try to extract through database first; avoids loading every key
+        db_path = get_database_path()
+        if db_path:
+            conn = _get_connection(db_path)
+            columns = _keys_columns(db_path)
+            wif_columns = [f"k.{col}" for col in ('wif', 'key_wif') if col in columns]
+            
+            key_data = None
+            if wif_columns:
+                wif_expr = wif_columns[0] if len(wif_columns) == 1 else f"COALESCE({', '.join(wif_columns)})"
+                key_data = conn.execute(
+                    f"SELECT {wif_expr} FROM keys k JOIN wallets w ON k.wallet_id = w.id "
+                    "WHERE w.name=? AND (k.path IN ('m', 'm/', '') OR k.path IS NULL) "
+                    f"AND {wif_expr} IS NOT NULL ORDER BY k.id LIMIT 1",
+                    (wallet_name,)
+                ).fetchone()
+            
+            if key_data and key_data[0]:
+                print(f"Master Private Key from DB (WIF): {key_data[0]}")
+                print("\nYou can import this private key into Electrum.")
+                return key_data[0]
+        
+        # Fall back to the wallet object
         wallet = Wallet(wallet_name)
         
-        # Try to get the main key and wif
-        main_key = None
-        for key in wallet.keys():
-            if key.path in ['m', 'm/', '']:
-                main_key = key
-                break
+        # Ask the wallet for its master key directly instead of scanning every key
+        main_key = getattr(wallet, 'main_key', None)
+        if main_key is None and hasattr(wallet, 'key_for_path'):
+            for path in ['m', '']:
+                try:
+                    main_key = wallet.key_for_path(path)
+                except Exception:
+                    main_key = None
+                if main_key:
+                    break
         
         if main_key:
             try:
@@ -214,33 +334,36 @@ def extract_master_key(wallet_name):
             except:
                 print("Could not extract WIF from master key.")
         
-        # Try to extract through database
-        db_path = get_database_path()
-        if db_path:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Try to get master private key from database
-            cursor.execute(
-                "SELECT key_wif FROM keys WHERE wallet_id IN "
-                "(SELECT id FROM wallets WHERE name=?) AND path IN ('m', 'm/', '')", 
-                (wallet_name,)
-            )
-            key_data = cursor.fetchone()
-            
-            if key_data and key_data[0]:
-                print(f"Master Private Key from DB (WIF): {key_data[0]}")
-                print("\nYou can import this private key into Electrum.")
-                return key_data[0]
-            
-            conn.close()
-        
         print("Could not extract master private key.")
         return None
     except Exception as e:
         print(f"Error extracting master key: {e}")
         return None
 
+# Unspent outputs of a wallet joined with the key that owns them
+UTXO_QUERY = """
+    SELECT
+        t.tx_hash, t.output_n, t.value, t.key_id, t.script,
+        k.address, k.wif, k.path
+    FROM
+        transactions t
+    JOIN
+        keys k ON t.key_id = k.id
+    JOIN
+        wallets w ON t.wallet_id = w.id
+    WHERE
+        w.name=? AND t.spent=0
+"""
+
+def _fetch_utxos(conn, wallet_name):
+    """
+    Return a wallet's unspent outputs as sqlite3.Row objects
+    """
+    # Set on the cursor so the shared connection keeps returning tuples
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return cursor.execute(UTXO_QUERY, (wallet_name,)).fetchall()
+
 def direct_utxo_access(wallet_name):
     """
     Directly access UTXOs from the database
@@ -253,85 +376,52 @@ def direct_utxo_access(wallet_name):
         return None
     
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Get wallet ID
-        cursor.execute("SELECT id FROM wallets WHERE name=?", (wallet_name,))
-        wallet_id_data = cursor.fetchone()
-        
-        if not wallet_id_data:
-            print(f"Wallet '{wallet_name}' not found in database.")
-            return None
-        
-        wallet_id = wallet_id_data[0]
-        
-        # Get UTXOs directly from database
-        cursor.execute("""
-            SELECT 
-                t.tx_hash, t.output_n, t.value, t.key_id, t.script, 
-                k.address, k.wif, k.path
-            FROM
-                transactions t
-            JOIN
-                keys k ON t.key_id = k.id
-            WHERE
-                t.wallet_id=? AND t.spent=0
-        """, (wallet_id,))
-        
-        utxos = cursor.fetchall()
+        # Get UTXOs directly from database, resolving the wallet in the same query
+        conn = _get_connection(db_path)
+        utxos = _fetch_utxos(conn, wallet_name)
         
         if not utxos:
-            print("No unspent outputs found in database.")
+            if _get_wallet_id(conn, wallet_name) is None:
+                print(f"Wallet '{wallet_name}' not found in database.")
+            else:
+                print("No unspent outputs found in database.")
             return None
         
-        total_value = 0
-        print("\nFound UTXOs directly in database:")
-        print("-" * 80)
-        print(f"{'TXID':<32} {'Output #':<8} {'Value (BTC)':<12} {'Address':<35} {'Path'}")
-        print("-" * 80)
+        # Build the whole report first and write it in one go rather than
+        # printing (and flushing) once per UTXO
+        total_value = sum(utxo['value'] for utxo in utxos)
+        lines = [
+            "\nFound UTXOs directly in database:",
+            "-" * 80,
+            f"{'TXID':<32} {'Output #':<8} {'Value (BTC)':<12} {'Address':<35} {'Path'}",
+            "-" * 80,
+        ]
+        lines.extend(
+            f"{utxo['tx_hash'][:30]}... {utxo['output_n']:<8} {utxo['value'] / 1e8:<12.8f} {utxo['address']:<35} {utxo['path']}"
+            for utxo in utxos
+        )
+        lines.append("-" * 80)
+        lines.append(f"Total value: {total_value / 1e8:.8f} BTC")
         
-        utxo_data = []
+        lines.append("\nPrivate keys for these UTXOs:")
         for utxo in utxos:
-            tx_hash, output_n, value, key_id, script, address, wif, path = utxo
-            print(f"{tx_hash[:30]}... {output_n:<8} {value / 1e8:<12.8f} {address:<35} {path}")
-            total_value += value
-            
-            utxo_data.append({
-                'tx_hash': tx_hash,
-                'output_n': output_n,
-                'value': value,
-                'key_id': key_id,
-                'script': script,
-                'address': address,
-                'wif': wif,
-                'path': path
-            })
-        
-        print("-" * 80)
-        print(f"Total value: {total_value / 1e8:.8f} BTC")
-        
-        if utxo_data:
-            print("\nPrivate keys for these UTXOs:")
-            for utxo in utxo_data:
-                if utxo.get('wif'):
-                    print(f"Address: {utxo['address']}")
-                    print(f"Private Key (WIF): {utxo['wif']}")
-                    print(f"Value: {utxo['value'] / 1e8:.8f} BTC")
-                    print("-" * 50)
-        
-        conn.close()
-        
-        if utxo_data:
-            return utxo_data
-        return None
+            if utxo['wif']:
+                lines.append(f"Address: {utxo['address']}")
+                lines.append(f"Private Key (WIF): {utxo['wif']}")
+                lines.append(f"Value: {utxo['value'] / 1e8:.8f} BTC")
+                lines.append("-" * 50)
+        sys.stdout.write("\n".join(lines) + "\n")
+        
+        # Rows support utxo['column'] access, so they are returned as-is
+        return utxos
     except Exception as e:
         print(f"Error in direct UTXO access: {e}")
         return None
 
-def create_emergency_transaction(wallet_name, destination_address):
+def create_emergency_transaction(wallet_name, destination_address, utxos=None):
     """
-    Create an emergency transaction to send all funds to a destination address
+    Create an emergency transaction to send all funds to a destination address.
+    Pass the rows from direct_utxo_access as utxos to skip re-reading them.
     """
     print("\n=== ATTEMPTING EMERGENCY TRANSACTION ===")
     
@@ -339,8 +429,19 @@ def create_emergency_transaction(wallet_name, destination_address):
         print("No destination address provided.")
         return False
     
-    # Get UTXOs
-    utxos = direct_utxo_access(wallet_name)
+    # Get UTXOs, without the table and key printout of direct_utxo_access
+    if utxos is None:
+        db_path = get_database_path()
+        if not db_path:
+            print("Could not find bitcoinlib database file.")
+            return False
+        
+        try:
+            utxos = _fetch_utxos(_get_connection(db_path), wallet_name)
+        except Exception as e:
+            print(f"Error reading UTXOs from database: {e}")
+            return False
+    
     if not utxos:
         print("No UTXOs found for emergency transaction.")
         return False
@@ -351,27 +452,25 @@ def create_emergency_transaction(wallet_name, destination_address):
         
         # Approach 1: Try using wallet.send_to
         try:
-            wallet = Wallet(wallet_name)
             fee = 5000  # 5000 satoshis (conservative)
             
-            # Calculate total amount
+            # Calculate total amount from the rows already fetched
             total_value = sum(utxo['value'] for utxo in utxos)
             amount = total_value - fee
+            print(f"Found {len(utxos)} UTXOs worth {total_value / 1e8:.8f} BTC")
             
             if amount <= 0:
                 print(f"Amount after fee too small: {amount} satoshis")
                 return False
             
+            # Only open the wallet once we know there is something to send
+            wallet = Wallet(wallet_name)
+            
             print(f"Attempting to send {amount / 1e8:.8f} BTC with fee {fee / 1e8:.8f} BTC")
             
             tx = wallet.send_to(destination_address, amount, fee=fee)
             
-            # Try to get transaction ID
-            tx_id = None
-            for attr in ['hash', 'txid', 'tx_hash', 'id']:
-                if hasattr(tx, attr):
-                    tx_id = getattr(tx, attr)
-                    break
+            tx_id = getattr(tx, TX_ID_ATTR, None)
             
             print(f"Transaction created successfully!")
             print(f"Transaction ID: {tx_id or 'Unknown'}")
@@ -409,11 +508,8 @@ def list_and_select_wallet():
     
     for i, wallet_info in enumerate(wallets, 1):
         name = wallet_info.get('name', 'Unknown')
-        network = "Unknown"
-        for key in ['network_name', 'network', 'scheme']:
-            if key in wallet_info:
-                network = wallet_info[key]
-                break
+        network = next((wallet_info[key] for key in ('network_name', 'network', 'scheme')
+                        if key in wallet_info), "Unknown")
         
         print(f"{i}. {name:<28} {network:<10} {'Active'}")
     
@@ -443,6 +539,45 @@ def display_recovery_options():
     choice = input("\nSelect option (1-6): ")
     return choice
 
+def prompt_emergency_transaction(wallet_name):
+    """Ask for a destination address and move all funds there"""
+    destination = input("\nEnter destination Bitcoin address: ")
+    create_emergency_transaction(wallet_name, destination)
+
+def try_all_recovery_methods(wallet_name):
+    """Run every recovery method in turn, reusing the shared connection"""
+    print("\n=== TRYING ALL RECOVERY METHODS ===")
+    seed = extract_wallet_seed(wallet_name)
+    if not seed:
+        extract_master_key(wallet_name)
+    
+    utxos = direct_utxo_access(wallet_name)
+    
+    if utxos:
+        create_tx = input("\nDo you want to create an emergency transaction to move funds? (y/n): ")
+        if create_tx.lower() == 'y':
+            destination = input("Enter destination Bitcoin address: ")
+            create_emergency_transaction(wallet_name, destination, utxos)
+
+def exit_recovery(wallet_name):
+    """Leave the recovery tool"""
+    print("Exiting recovery tool.")
+    sys.exit(0)
+
+def invalid_choice(wallet_name):
+    """Handle a menu choice that isn't listed"""
+    print("Invalid choice. Please try again.")
+
+# Menu choice -> action, each called with the selected wallet name
+RECOVERY_ACTIONS = {
+    '1': extract_wallet_seed,
+    '2': extract_master_key,
+    '3': direct_utxo_access,
+    '4': prompt_emergency_transaction,
+    '5': try_all_recovery_methods,
+    '6': exit_recovery,
+}
+
 def main():
     print("\n=======================")
     print("ADVANCED WALLET RECOVERY")
@@ -460,34 +595,7 @@ def main():
     
     while True:
         choice = display_recovery_options()
-        
-        if choice == '1':
-            extract_wallet_seed(wallet_name)
-        elif choice == '2':
-            extract_master_key(wallet_name)
-        elif choice == '3':
-            direct_utxo_access(wallet_name)
-        elif choice == '4':
-            destination = input("\nEnter destination Bitcoin address: ")
-            create_emergency_transaction(wallet_name, destination)
-        elif choice == '5':
-            print("\n=== TRYING ALL RECOVERY METHODS ===")
-            seed = extract_wallet_seed(wallet_name)
-            if not seed:
-                master_key = extract_master_key(wallet_name)
-            
-            utxos = direct_utxo_access(wallet_name)
-            
-            if utxos:
-                create_tx = input("\nDo you want to create an emergency transaction to move funds? (y/n): ")
-                if create_tx.lower() == 'y':
-                    destination = input("Enter destination Bitcoin address: ")
-                    create_emergency_transaction(wallet_name, destination)
-        elif choice == '6':
-            print("Exiting recovery tool.")
-            sys.exit(0)
-        else:
-            print("Invalid choice. Please try again.")
+        RECOVERY_ACTIONS.get(choice, invalid_choice)(wallet_name)
         
         input("\nPress Enter to continue...")
 
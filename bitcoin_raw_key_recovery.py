@@ -13,10 +13,33 @@ import binascii
 import hashlib
 import base58
 import codecs
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 
-def sha256(data):
-    """Calculate SHA256 hash"""
-    return hashlib.sha256(data).digest()
+# Prefer the Rust-backed encoder when installed; output is identical
+try:
+    from based58 import b58encode as _b58encode
+except ImportError:
+    from base58 import b58encode as _b58encode
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Below this many candidates, worker start-up costs more than it saves
+PARALLEL_THRESHOLD = 20000
+
+# Order of the secp256k1 group; valid private keys are in [1, N-1]
+SECP256K1_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# Windows that can never be valid secp256k1 private keys
+_ZERO_KEY = bytes(32)
+_FF_KEY = b'\xff' * 32
+
+def _dsha(data, _sha256=hashlib.sha256):
+    """Calculate double SHA256 hash"""
+    return _sha256(_sha256(data).digest()).digest()
 
 def convert_to_wif(private_key_bytes):
     """Convert raw private key bytes to WIF format"""
@@ -27,13 +50,86 @@ def convert_to_wif(private_key_bytes):
     # extended_key += b'\x01'  # Uncomment to generate compressed WIF
     
     # Double SHA-256 hash for checksum
-    checksum = sha256(sha256(extended_key))[:4]
+    checksum = _dsha(extended_key)[:4]
     
     # Combine and encode
-    wif_key = base58.b58encode(extended_key + checksum)
+    wif_key = _b58encode(extended_key + checksum)
     
     return wif_key.decode('utf-8')
 
+def convert_to_wif_batch(keys):
+    """Convert a sequence of raw private keys to WIF format"""
+    # Bind the hot callables locally so the loop skips global/attribute lookups
+    dsha = _dsha
+    b58encode = _b58encode
+    
+    # One reusable version byte + key + checksum buffer instead of two
+    # fresh bytes objects per key; local, so each worker gets its own
+    buf = bytearray(37)
+    buf[0] = 0x80
+    extended_key = memoryview(buf)[:33]
+    
+    wifs = []
+    for private_key_bytes in keys:
+        buf[1:33] = private_key_bytes
+        buf[33:] = dsha(extended_key)[:4]
+        wifs.append(b58encode(bytes(buf)).decode('utf-8'))
+    return wifs
+
+def convert_to_wif_parallel(keys, workers=None):
+    """Convert raw private keys to WIF format, spread across CPU cores"""
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or len(keys) < PARALLEL_THRESHOLD:
+        return convert_to_wif_batch(keys)
+    
+    # A few chunks per worker keeps the pool busy if some finish early
+    chunk_size = -(-len(keys) // (workers * 4))
+    chunks = [keys[i:i+chunk_size] for i in range(0, len(keys), chunk_size)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return [wif for wifs in pool.map(convert_to_wif_batch, chunks) for wif in wifs]
+    except Exception as e:
+        print(f"Parallel conversion unavailable ({e}), converting sequentially")
+        return convert_to_wif_batch(keys)
+
+def candidate_offsets(raw_data, stride=8):
+    """
+    Return offsets of the 32-byte windows worth converting to WIF,
+    skipping all-zero and all-0xFF windows
+    """
+    offsets = range(0, len(raw_data) - 32, stride)
+    if not offsets:
+        return []
+    
+    if np is None:
+        return [offset for offset in offsets
+                if raw_data[offset:offset+32] not in (_ZERO_KEY, _FF_KEY)]
+    
+    # Filter every window in one vectorized pass over a strided view
+    arr = np.frombuffer(raw_data, dtype=np.uint8)
+    windows = np.lib.stride_tricks.sliding_window_view(arr, 32)[::stride][:len(offsets)]
+    keep = windows.any(axis=1) & ~(windows == 0xFF).all(axis=1)
+    return (np.flatnonzero(keep) * stride).tolist()
+
+def is_valid_private_key(private_key_bytes):
+    """Check that 32 bytes are a usable secp256k1 private key (1 <= k < N)"""
+    return 0 < int.from_bytes(private_key_bytes, 'big') < SECP256K1_N
+
+def looks_like_text(raw_data, max_size=1024):
+    """Cheap check for small, printable ASCII input before decoding it"""
+    if len(raw_data) >= max_size:
+        return False
+    return all(32 <= b < 127 or b in (9, 10, 13) for b in raw_data[:256])
+
+def describe_offsets(offsets, limit=10):
+    """Describe where in the raw data a 32-byte sequence was found"""
+    if len(offsets) == 1:
+        return f'32-byte sequence at offset {offsets[0]}'
+    shown = ', '.join(str(offset) for offset in offsets[:limit])
+    if len(offsets) > limit:
+        shown += f', ... ({len(offsets)} occurrences)'
+    return f'32-byte sequence at offsets {shown}'
+
 def extract_private_key(raw_data):
     """
     Try different approaches to extract a private key from raw data
@@ -53,19 +149,38 @@ def extract_private_key(raw_data):
         attempted_formats.append('Direct 32-byte key')
     
     # Try to find a 32-byte sequence with a standard prefix
-    for offset in range(0, len(raw_data) - 32, 8):
-        private_key_bytes = raw_data[offset:offset+32]
-        wif = convert_to_wif(private_key_bytes)
+    # Identical windows (repeated pages, padding) are converted only once,
+    # remembering every offset they were seen at
+    key_offsets = {}
+    for offset in candidate_offsets(raw_data):
+        key_offsets.setdefault(raw_data[offset:offset+32], []).append(offset)
+    # Wallets reject scalars outside [1, N-1], so don't bother encoding them
+    candidates = [key for key in key_offsets if is_valid_private_key(key)]
+    wifs = convert_to_wif_parallel(candidates)
+    for private_key_bytes, wif in zip(candidates, wifs):
+        method = describe_offsets(key_offsets[private_key_bytes])
         results.append({
-            'method': f'32-byte sequence at offset {offset}',
+            'method': method,
             'wif': wif,
             'raw_bytes': binascii.hexlify(private_key_bytes).decode('utf-8')
         })
-        attempted_formats.append(f'32-byte sequence at offset {offset}')
+        attempted_formats.append(method)
+    
+    # Text formats only make sense for small, printable input; binary dumps
+    # skip the decode entirely (slicing first so mmap input works too)
+    text = None
+    if looks_like_text(raw_data):
+        try:
+            text = raw_data[:].decode('utf-8').strip()
+        except UnicodeDecodeError:
+            pass
+    
+    if text is None:
+        return results, attempted_formats
     
     # Try to interpret as hex string
     try:
-        hex_str = raw_data.decode('utf-8').strip()
+        hex_str = text
         if len(hex_str) >= 64:  # A private key is 32 bytes = 64 hex chars
             hex_key = hex_str[:64]
             private_key_bytes = binascii.unhexlify(hex_key)
@@ -81,24 +196,28 @@ def extract_private_key(raw_data):
     
     # Try to interpret as Base58Check encoded data
     try:
-        base58_str = raw_data.decode('utf-8').strip()
-        try:
-            decoded = base58.b58decode(base58_str)
-            # If this is a WIF already, just return it
-            if decoded[0] == 0x80 and (len(decoded) == 37 or len(decoded) == 38):
-                results.append({
-                    'method': 'Already WIF format',
-                    'wif': base58_str,
-                    'raw_bytes': binascii.hexlify(decoded[1:33]).decode('utf-8')
-                })
-                attempted_formats.append('Already WIF format')
-        except:
-            pass
+        base58_str = text
+        decoded = base58.b58decode(base58_str)
+        # If this is a WIF already, just return it
+        if decoded[0] == 0x80 and (len(decoded) == 37 or len(decoded) == 38):
+            results.append({
+                'method': 'Already WIF format',
+                'wif': base58_str,
+                'raw_bytes': binascii.hexlify(decoded[1:33]).decode('utf-8')
+            })
+            attempted_formats.append('Already WIF format')
     except:
         pass
     
     return results, attempted_formats
 
+def format_result(index, result):
+    """Format one recovered key as a block of the output file"""
+    return (f"Possible Key #{index}:\n"
+            f"Method: {result['method']}\n"
+            f"WIF Private Key: {result['wif']}\n"
+            f"Raw Bytes (hex): {result['raw_bytes']}\n\n")
+
 def process_raw_key_file(filename):
     """
     Process a file containing raw key data
@@ -109,7 +228,12 @@ def process_raw_key_file(filename):
     
     try:
         with open(filename, 'rb') as f:
-            raw_data = f.read()
+            # Map the file rather than reading it, so only the pages the
+            # window scan touches are loaded (mmap can't map an empty file)
+            if os.fstat(f.fileno()).st_size:
+                raw_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                raw_data = b''
         
         print(f"Read {len(raw_data)} bytes from {filename}")
         
@@ -122,6 +246,8 @@ def process_raw_key_file(filename):
         # Try to extract private key
         print("\nAttempting to extract private key...")
         results, attempted_formats = extract_private_key(raw_data)
+        if isinstance(raw_data, mmap.mmap):
+            raw_data.close()
         
         if not results:
             print("Could not extract private key. Attempted formats:", ", ".join(attempted_formats))
@@ -142,12 +268,7 @@ def process_raw_key_file(filename):
         with open(output_file, 'w') as f:
             f.write("Recovered Bitcoin Private Keys\n")
             f.write("=============================\n\n")
-            
-            for i, result in enumerate(results, 1):
-                f.write(f"Possible Key #{i}:\n")
-                f.write(f"Method: {result['method']}\n")
-                f.write(f"WIF Private Key: {result['wif']}\n")
-                f.write(f"Raw Bytes (hex): {result['raw_bytes']}\n\n")
+            f.writelines(format_result(i, result) for i, result in enumerate(results, 1))
         
         print(f"\nSaved all possible keys to {output_file}")
         print("\nINSTRUCTIONS:")
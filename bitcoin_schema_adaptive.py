@@ -8,11 +8,17 @@ and adapts to it, making it compatible with any version of bitcoinlib.
 
 import sys
 import os
+import io
 import sqlite3
 import json
+import argparse
+import functools
+import itertools
+import operator
 from pathlib import Path
 
-def get_database_path():
+@functools.lru_cache(maxsize=2)
+def get_database_path(deep_search=False):
     """Get the path to the bitcoinlib database file"""
     home_dir = Path.home()
     default_db_path = home_dir / ".bitcoinlib" / "database" / "bitcoinlib.sqlite"
@@ -24,32 +30,127 @@ def get_database_path():
     if os.path.exists(windows_db_path):
         return windows_db_path
     
-    # Try to find by searching
-    for root_dir in [home_dir, Path(os.getenv('APPDATA', ''))]:
-        for path in root_dir.glob("**/*bitcoinlib*.sqlite"):
-            return path
+    # Look for any .sqlite file in the known database directories
+    database_dirs = [home_dir / ".bitcoinlib" / "database"]
+    for env_var in ['APPDATA', 'LOCALAPPDATA']:
+        if os.getenv(env_var):
+            database_dirs.append(Path(os.getenv(env_var)) / "bitcoinlib" / "database")
+    for database_dir in database_dirs:
+        try:
+            with os.scandir(database_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(".sqlite"):
+                        return Path(entry.path)
+        except OSError:
+            continue
+    
+    # Try to find by searching the whole home directory (slow, opt-in)
+    if deep_search:
+        for root_dir in [home_dir, Path(os.getenv('APPDATA', ''))]:
+            for path in root_dir.glob("**/*bitcoinlib*.sqlite"):
+                return path
     
     return None
 
-def analyze_database_schema(conn):
+# Key columns to show, in display order; only those present in the schema are selected
+KEY_COLUMNS = ['id', 'address', 'path', 'wif', 'private', 'public', 'is_private']
+
+# Rows fetched per batch when streaming keys and UTXOs
+FETCH_BATCH_SIZE = 1024
+
+# Connection settings for a short read-mostly run, applied in one executescript.
+# journal_mode is left alone: switching it fails on WAL databases opened read-only
+PRAGMAS = """
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-64000;
+PRAGMA temp_store=MEMORY;
+PRAGMA synchronous=OFF;
+"""
+
+# Transaction column names seen across bitcoinlib versions, as
+# (exact names to try first, name fragments to fall back on)
+TX_HASH_COLUMNS = (('txid', 'tx_hash', 'hash'), ('hash', 'txid'))
+TX_OUTPUT_COLUMNS = (('output_n', 'output_index', 'index'), ('output', 'index'))
+TX_VALUE_COLUMNS = (('value', 'amount'), ('value', 'amount'))
+TX_SPENT_COLUMNS = (('spent', 'is_spent'), ('spent',))
+
+def find_column(columns_by_name, candidates):
+    """
+    Pick a column from a {lowercase name: name} dict, by exact name if
+    possible, otherwise by the first name containing one of the fragments
+    """
+    names, fragments = candidates
+    for name in names:
+        if name in columns_by_name:
+            return columns_by_name[name]
+    return next((col for low, col in columns_by_name.items()
+                 if any(fragment in low for fragment in fragments)), None)
+
+@functools.lru_cache(maxsize=32)
+def select_sql(table, columns, where):
+    """
+    Build a SELECT statement once per (table, columns, where) combination.
+    Identifiers are quoted and values are always bound as parameters, so the
+    SQL text is stable and sqlite3's per-connection statement cache reuses
+    the compiled statement.
+    """
+    column_str = ", ".join('"' + col.replace('"', '""') + '"' for col in columns)
+    return f"SELECT {column_str} FROM {table} WHERE {where}"
+
+def open_database(db_path, immutable=False):
+    """
+    Open the bitcoinlib database read-only, with PRAGMAs tuned for scanning.
+    immutable=True also skips locking and change detection, so only use it
+    when nothing else (e.g. bitcoinlib) has the database open.
+    """
+    base_uri = Path(db_path).as_uri()
+    read_only_modes = [
+        "mode=ro&nolock=1&immutable=1" if immutable else "mode=ro&nolock=1",
+        "mode=ro",
+    ]
+    
+    for i, mode in enumerate(read_only_modes):
+        conn = sqlite3.connect(f"{base_uri}?{mode}", uri=True, check_same_thread=False)
+        try:
+            # Connecting is lazy, so touch the file to see if the mode works
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1")
+            break
+        except sqlite3.OperationalError:
+            conn.close()
+            # Plain mode=ro is the last resort; never fall back to read-write
+            if i == len(read_only_modes) - 1:
+                raise
+    
+    conn.executescript(PRAGMAS)
+    return conn
+
+def analyze_database_schema(conn, verbose=False):
     """
     Analyze the database schema to understand its structure
+    The schema and sample rows are only printed when verbose is set
     """
-    print("\n==== DATABASE SCHEMA ANALYSIS ====")
     cursor = conn.cursor()
     
-    # Get list of tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = [row[0] for row in cursor.fetchall()]
-    print(f"Tables found: {', '.join(tables)}")
+    # Get every table and its columns in one query
+    cursor.execute(
+        "SELECT m.name, p.name FROM sqlite_master m "
+        "JOIN pragma_table_info(m.name) p WHERE m.type='table' "
+        "ORDER BY m.rowid, p.cid"
+    )
+    schema_info = {
+        table: [row[1] for row in rows]
+        for table, rows in itertools.groupby(cursor.fetchall(), key=operator.itemgetter(0))
+    }
+    if not verbose:
+        return schema_info
     
-    schema_info = {}
+    # Collect the report and write it out in one go
+    buf = io.StringIO()
+    buf.write("\n==== DATABASE SCHEMA ANALYSIS ====\n")
+    buf.write(f"Tables found: {', '.join(schema_info)}\n")
     
-    for table in tables:
-        cursor.execute(f"PRAGMA table_info({table})")
-        columns = [row[1] for row in cursor.fetchall()]
-        schema_info[table] = columns
-        print(f"\nTable '{table}' columns: {', '.join(columns)}")
+    for table, columns in schema_info.items():
+        buf.write(f"\nTable '{table}' columns: {', '.join(columns)}\n")
         
         # For key tables, show a sample row
         if table in ['wallets', 'keys', 'transactions']:
@@ -57,7 +158,7 @@ def analyze_database_schema(conn):
                 cursor.execute(f"SELECT * FROM {table} LIMIT 1")
                 row = cursor.fetchone()
                 if row:
-                    print(f"Sample row from '{table}':")
+                    buf.write(f"Sample row from '{table}':\n")
                     column_values = []
                     for i, column in enumerate(columns):
                         value = row[i]
@@ -67,34 +168,37 @@ def analyze_database_schema(conn):
                                 if len(value_str) > 50:
                                     value_str = value_str[:47] + "..."
                                 column_values.append(f"{column}: {value_str}")
-                    print(", ".join(column_values))
+                    buf.write(", ".join(column_values))
+                    buf.write("\n")
             except Exception as e:
-                print(f"Error getting sample row: {e}")
+                buf.write(f"Error getting sample row: {e}\n")
+    
+    sys.stdout.write(buf.getvalue())
     
     return schema_info
 
-def recover_from_wallet(wallet_name):
+def recover_from_wallet(wallet_name, immutable=False, deep_search=False, verbose=False):
     """
     Recover keys and funds from wallet using schema-adaptive approach
     """
-    db_path = get_database_path()
+    db_path = get_database_path(deep_search)
     if not db_path:
         print("Could not find bitcoinlib database file.")
+        if not deep_search:
+            print("Run with --deep-search to search your whole home directory for it.")
         return None
     
     print(f"Database found at: {db_path}")
     
     try:
-        # Connect to SQLite database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        # Connect to SQLite database (read-only, this tool never writes to it)
+        conn = open_database(db_path, immutable=immutable)
         
         # Analyze schema
-        schema_info = analyze_database_schema(conn)
+        schema_info = analyze_database_schema(conn, verbose=verbose)
         
         # Get wallet ID
-        cursor.execute("SELECT id FROM wallets WHERE name=?", (wallet_name,))
-        wallet_id_data = cursor.fetchone()
+        wallet_id_data = conn.execute("SELECT id FROM wallets WHERE name=?", (wallet_name,)).fetchone()
         
         if not wallet_id_data:
             print(f"Wallet '{wallet_name}' not found in database.")
@@ -107,9 +211,7 @@ def recover_from_wallet(wallet_name):
         print("\n==== WALLET INFO ====")
         if 'wallets' in schema_info:
             columns = schema_info['wallets']
-            column_str = ", ".join(columns)
-            cursor.execute(f"SELECT {column_str} FROM wallets WHERE id=?", (wallet_id,))
-            wallet_data = cursor.fetchone()
+            wallet_data = conn.execute(select_sql('wallets', tuple(columns), "id=?"), (wallet_id,)).fetchone()
             
             if wallet_data:
                 for i, col in enumerate(columns):
@@ -120,26 +222,15 @@ def recover_from_wallet(wallet_name):
         print("\n==== KEYS ====")
         if 'keys' in schema_info:
             key_columns = schema_info['keys']
-            needed_columns = ['id', 'address', 'path']
-            optional_columns = ['wif', 'private', 'public', 'is_private']
-            
-            select_columns = []
-            for col in needed_columns:
-                if col in key_columns:
-                    select_columns.append(col)
-            
-            for col in optional_columns:
-                if col in key_columns:
-                    select_columns.append(col)
+            select_columns = [col for col in KEY_COLUMNS if col in key_columns]
             
-            column_str = ", ".join(select_columns)
+            cursor = conn.cursor()
+            cursor.arraysize = FETCH_BATCH_SIZE
+            cursor.execute(select_sql('keys', tuple(select_columns), "wallet_id=?"), (wallet_id,))
             
-            cursor.execute(f"SELECT {column_str} FROM keys WHERE wallet_id=?", (wallet_id,))
-            keys = cursor.fetchall()
-            
-            if keys:
-                print(f"Found {len(keys)} keys")
-                
+            # Print keys batch by batch as they're read instead of loading them all
+            key_count = 0
+            for keys in iter(cursor.fetchmany, []):
                 for key in keys:
                     print("\n----------------------------")
                     for i, col in enumerate(select_columns):
@@ -147,6 +238,10 @@ def recover_from_wallet(wallet_name):
                             print(f"{col} (first bytes only): {str(key[i])[:30]}...")
                         else:
                             print(f"{col}: {key[i]}")
+                key_count += len(keys)
+            
+            if key_count:
+                print(f"\nFound {key_count} keys")
             else:
                 print("No keys found")
         
@@ -156,29 +251,34 @@ def recover_from_wallet(wallet_name):
             tx_columns = schema_info['transactions']
             
             # Find likely column names
-            hash_column = next((col for col in tx_columns if 'hash' in col.lower() or 'txid' in col.lower()), None)
-            output_column = next((col for col in tx_columns if 'output' in col.lower() or 'index' in col.lower()), None)
-            value_column = next((col for col in tx_columns if 'value' in col.lower() or 'amount' in col.lower()), None)
-            spent_column = next((col for col in tx_columns if 'spent' in col.lower()), None)
+            columns_by_name = {col.lower(): col for col in tx_columns}
+            hash_column = find_column(columns_by_name, TX_HASH_COLUMNS)
+            output_column = find_column(columns_by_name, TX_OUTPUT_COLUMNS)
+            value_column = find_column(columns_by_name, TX_VALUE_COLUMNS)
+            spent_column = find_column(columns_by_name, TX_SPENT_COLUMNS)
             
             if hash_column and value_column:
                 query_parts = [hash_column, value_column]
                 if output_column:
                     query_parts.append(output_column)
                 
-                where_clause = f"wallet_id={wallet_id}"
+                where_clause = "wallet_id=?"
                 if spent_column:
-                    where_clause += f" AND {spent_column}=0"
+                    where_clause += f' AND "{spent_column}"=0'
                 
-                query = f"SELECT {', '.join(query_parts)} FROM transactions WHERE {where_clause}"
+                query = select_sql('transactions', tuple(query_parts), where_clause)
                 
                 try:
-                    cursor.execute(query)
-                    utxos = cursor.fetchall()
+                    cursor = conn.cursor()
+                    cursor.arraysize = FETCH_BATCH_SIZE
+                    cursor.execute(query, (wallet_id,))
                     
-                    if utxos:
-                        print(f"Found {len(utxos)} unspent outputs")
-                        total_value = 0
+                    utxo_count = 0
+                    total_value = 0
+                    for utxos in iter(cursor.fetchmany, []):
+                        # Total each batch in C before formatting its rows
+                        total_value += sum(map(operator.itemgetter(1), utxos))
+                        utxo_count += len(utxos)
                         
                         for utxo in utxos:
                             print("\n----------------------------")
@@ -189,10 +289,10 @@ def recover_from_wallet(wallet_name):
                             print(f"Transaction hash: {tx_hash}")
                             print(f"Output index: {output_n}")
                             print(f"Value: {value / 1e8:.8f} BTC")
-                            
-                            total_value += value
-                        
-                        print(f"\nTotal value: {total_value / 1e8:.8f} BTC")
+                    
+                    if utxo_count:
+                        print(f"\nFound {utxo_count} unspent outputs")
+                        print(f"Total value: {total_value / 1e8:.8f} BTC")
                     else:
                         print("No unspent outputs found")
                 except Exception as e:
@@ -208,8 +308,9 @@ def recover_from_wallet(wallet_name):
         
         # Try direct WIF extraction
         if 'keys' in schema_info and 'wif' in schema_info['keys']:
-            cursor.execute(f"SELECT address, wif FROM keys WHERE wallet_id=? AND wif IS NOT NULL", (wallet_id,))
-            wif_keys = cursor.fetchall()
+            wif_keys = conn.execute(
+                "SELECT address, wif FROM keys WHERE wallet_id=? AND wif IS NOT NULL", (wallet_id,)
+            ).fetchall()
             
             if wif_keys:
                 private_keys_found = True
@@ -225,11 +326,10 @@ def recover_from_wallet(wallet_name):
         if 'keys' in schema_info:
             # Try different potential column combinations for master key
             if 'private' in schema_info['keys']:
-                cursor.execute(
+                master_key = conn.execute(
                     "SELECT address, private FROM keys WHERE wallet_id=? AND path IN ('m', '') LIMIT 1",
                     (wallet_id,)
-                )
-                master_key = cursor.fetchone()
+                ).fetchone()
                 
                 if master_key:
                     address, private = master_key
@@ -240,11 +340,22 @@ def recover_from_wallet(wallet_name):
                     # Export the raw private key bytes to a file
                     private_key_path = os.path.join(os.getcwd(), "private_key_export.bin")
                     try:
-                        with open(private_key_path, 'wb') as f:
-                            if isinstance(private, str):
-                                f.write(private.encode('utf-8', 'ignore'))
-                            else:
-                                f.write(private)
+                        if isinstance(private, str):
+                            private = private.encode('utf-8', 'ignore')
+                        
+                        # Owner-only permissions from the start, flushed to disk before closing
+                        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+                        fd = os.open(private_key_path, flags, 0o600)
+                        try:
+                            if hasattr(os, 'fchmod'):
+                                # The mode above only applies when the file is created
+                                os.fchmod(fd, 0o600)
+                            data = memoryview(private)
+                            while data:
+                                data = data[os.write(fd, data):]
+                            os.fsync(fd)
+                        finally:
+                            os.close(fd)
                         print(f"\nExported raw private key data to: {private_key_path}")
                         print("This file might be useful for advanced recovery methods.")
                     except Exception as e:
@@ -268,7 +379,22 @@ def recover_from_wallet(wallet_name):
         print(f"Error in recovery process: {e}")
         return None
 
+def parse_arguments():
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(description='Schema-Adaptive Bitcoin Recovery Tool')
+    parser.add_argument('--immutable', action='store_true',
+                        help='Open the database as immutable (only if bitcoinlib is not using it)')
+    parser.add_argument('--deep-search', action='store_true',
+                        help='Search the whole home directory for the database if it is not found')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Print the database schema and a sample row from the main tables')
+    return parser.parse_args()
+
 def main():
+    args = parse_arguments()
+    
     print("\n=======================")
     print("SCHEMA-ADAPTIVE BITCOIN RECOVERY TOOL")
     print("=======================")
@@ -281,7 +407,8 @@ def main():
         wallet_name = "forwarding_wallet"
     
     # Recover from wallet
-    recover_from_wallet(wallet_name)
+    recover_from_wallet(wallet_name, immutable=args.immutable, deep_search=args.deep_search,
+                        verbose=args.verbose)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,24 +9,72 @@ It also displays a QR code for the local wallet address in the terminal.
 Prerequisites:
 - Python 3.6+
 - Install required packages: pip install bitcoinlib qrcode
+- Optional, for --push notifications: pip install websocket-client
 """
 
 import time
 import sys
+import re
+import queue
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import argparse
+from importlib.metadata import version
 import os
 import json
+from collections import OrderedDict
+from operator import attrgetter, itemgetter
 from pathlib import Path
 from bitcoinlib.wallets import Wallet, wallet_exists
 from bitcoinlib.services.services import Service
 from bitcoinlib.keys import Address
 
+# QR display is optional; the QRCode instance is reused for every address
+try:
+    import qrcode
+    from qrcode.main import QRCode
+    _QR = QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=1,
+        border=1,
+    )
+except ImportError:
+    _QR = None
+
+# Push notifications (--push) are optional too
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+# orjson is a faster drop-in for reading and writing the config and UTXO cache
+try:
+    import orjson
+    
+    def _json_dumps(obj):
+        return orjson.dumps(obj)
+    
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+    
+    _json_loads = json.loads
+
+# NumPy only speeds up QR rendering
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Setup logging directory
 log_dir = Path.home() / ".bitcoin_forwarder"
 os.makedirs(log_dir, exist_ok=True)
 log_file = log_dir / "bitcoin_forwarder.log"
 config_file = log_dir / "config.json"
+utxo_cache_file = log_dir / "utxo_cache.json"
 
 # Setup logging
 logging.basicConfig(
@@ -39,6 +87,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger("BitcoinForwarder")
 
+# Hand file log records to a background thread so disk writes don't block the
+# monitor loop. Console logging stays synchronous so it stays in order with the
+# monitor's print() output; the listener is flushed and stopped at exit
+log_queue = queue.Queue(-1)
+root_logger = logging.getLogger()
+file_handlers = [h for h in root_logger.handlers if isinstance(h, logging.FileHandler)]
+log_listener = QueueListener(log_queue, *file_handlers, respect_handler_level=True)
+root_logger.handlers = [h for h in root_logger.handlers if h not in file_handlers]
+root_logger.addHandler(QueueHandler(log_queue))
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# Terminal glyphs for a pair of QR modules, indexed by upper + 2 * lower
+QR_HALF_BLOCKS = " ▀▄█"
+
+# Wallet updates between full scans; the others only update the receiving address
+FULL_SCAN_EVERY = 10
+
+# Inputs are checked against the service's UTXO list before broadcasting,
+# fetched this many UTXOs per request and up to this many pages per address
+UTXO_PAGE_LIMIT = 100
+UTXO_MAX_PAGES = 20
+
+# In --push mode the loop sleeps until the notification feed reports a new
+# transaction for the address or a new block, re-checking at least this often
+PUSH_URL = "wss://ws.blockchain.info/inv"
+PUSH_MAX_WAIT = 600
+
+# Different versions of bitcoinlib use different attribute names for the
+# transaction ID ('txid' from 0.6 on, 'hash' before); the pattern digs it out
+# of the repr as a last resort
+try:
+    TX_ID_ATTR = 'txid' if tuple(map(int, version('bitcoinlib').split('.')[:2])) >= (0, 6) else 'hash'
+except Exception:
+    TX_ID_ATTR = 'txid'
+_TXID_RE = re.compile(r'(txid|hash|id)[\'"\s:=]+([a-fA-F0-9]{64})', re.IGNORECASE)
+
+# Status line shown while waiting between checks, redrawn at most this often
+STATUS_MIN_INTERVAL = 1.0
+POLL_STATUS = "\rLast checked: %s. Checking again in %.0f seconds..."
+PUSH_STATUS = "\rLast checked: %s. Waiting for new transactions or blocks..."
+CLEAR_STATUS = "\r" + " " * 80 + "\r"
+
+# Handled UTXOs are remembered across restarts until they are this many blocks old
+UTXO_CACHE_DEPTH = 100
+
+# Fee estimates are reused for this many seconds to avoid repeated service calls;
+# fee rates rarely move much within a few minutes
+FEE_CACHE_TTL = 600
+_fee_cache = {}
+
+class SeenTxs:
+    """
+    Bounded set of processed "txid:vout" UTXO keys, evicting the least recently
+    seen once maxlen is exceeded. Lookups refresh an entry, so UTXOs still
+    sitting in the wallet are never the ones evicted. Keys are stored as ints
+    built from the first 64 bits of the txid and the output index, which is
+    far smaller than the hex string.
+    """
+    def __init__(self, maxlen=100000):
+        self.maxlen = maxlen
+        self._items = OrderedDict()
+    
+    @staticmethod
+    def _compact(utxo_key):
+        tx_id, _, output_n = utxo_key.partition(':')
+        try:
+            return (int(tx_id[:16], 16) << 32) | int(output_n or 0)
+        except ValueError:
+            return utxo_key
+    
+    def add(self, utxo_key):
+        key = self._compact(utxo_key)
+        self._items[key] = None
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxlen:
+            self._items.popitem(last=False)
+    
+    def __contains__(self, utxo_key):
+        key = self._compact(utxo_key)
+        if key in self._items:
+            self._items.move_to_end(key)
+            return True
+        return False
+    
+    def __len__(self):
+        return len(self._items)
+
+def load_utxo_cache():
+    """
+    Load the UTXOs handled by earlier runs, keyed by "txid:vout"
+    """
+    try:
+        with open(utxo_cache_file, 'rb') as f:
+            return _json_loads(f.read())
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.error("Failed to load UTXO cache: %s", e)
+        return {}
+
+def save_utxo_cache(utxo_cache):
+    """
+    Write the UTXO cache to a temporary file and swap it in, so an interrupted
+    write never leaves a truncated cache behind
+    """
+    tmp_file = utxo_cache_file.with_suffix('.tmp')
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps(utxo_cache))
+        os.replace(tmp_file, utxo_cache_file)
+    except Exception as e:
+        logger.error("Failed to save UTXO cache: %s", e)
+
+def prune_utxo_cache(utxo_cache, tip_height):
+    """
+    Drop cache entries recorded more than UTXO_CACHE_DEPTH blocks ago
+    Returns True if anything was removed
+    """
+    stale = [
+        utxo_key for utxo_key, entry in utxo_cache.items()
+        if entry.get('height') and tip_height - entry['height'] > UTXO_CACHE_DEPTH
+    ]
+    for utxo_key in stale:
+        del utxo_cache[utxo_key]
+    return bool(stale)
+
 def save_config(wallet_name, destination_address):
     """
     Save wallet name and destination address to config file
@@ -49,11 +224,11 @@ def save_config(wallet_name, destination_address):
     }
     
     try:
-        with open(config_file, 'w') as f:
-            json.dump(config, f)
+        with open(config_file, 'wb') as f:
+            f.write(_json_dumps(config))
         logger.info("Config saved successfully")
     except Exception as e:
-        logger.error(f"Failed to save config: {e}")
+        logger.error("Failed to save config: %s", e)
 
 def load_config():
     """
@@ -64,16 +239,16 @@ def load_config():
         return None, None
     
     try:
-        with open(config_file, 'r') as f:
-            config = json.load(f)
+        with open(config_file, 'rb') as f:
+            config = _json_loads(f.read())
         
         wallet_name = config.get('wallet_name')
         destination_address = config.get('destination_address')
         
-        logger.info(f"Loaded config: wallet={wallet_name}, destination={destination_address}")
+        logger.info("Loaded config: wallet=%s, destination=%s", wallet_name, destination_address)
         return wallet_name, destination_address
     except Exception as e:
-        logger.error(f"Failed to load config: {e}")
+        logger.error("Failed to load config: %s", e)
         return None, None
 
 def validate_bitcoin_address(address):
@@ -84,7 +259,7 @@ def validate_bitcoin_address(address):
         Address.parse(address)
         return True
     except Exception as e:
-        logger.error(f"Invalid Bitcoin address: {e}")
+        logger.error("Invalid Bitcoin address: %s", e)
         return False
 
 def get_or_create_wallet(wallet_name="forwarding_wallet"):
@@ -92,24 +267,67 @@ def get_or_create_wallet(wallet_name="forwarding_wallet"):
     Get existing wallet or create a new one if it doesn't exist
     """
     if wallet_exists(wallet_name):
-        logger.info(f"Using existing wallet: {wallet_name}")
+        logger.info("Using existing wallet: %s", wallet_name)
         wallet = Wallet(wallet_name)
     else:
-        logger.info(f"Creating new wallet: {wallet_name}")
+        logger.info("Creating new wallet: %s", wallet_name)
         wallet = Wallet.create(wallet_name, network='bitcoin')
     
     key = wallet.get_key()
     address = key.address
-    logger.info(f"Wallet address: {address}")
+    logger.info("Wallet address: %s", address)
     return wallet, address
 
-def monitor_wallet(wallet, destination_address, required_confirmations=3, check_interval=60):
+def open_push_connection(address):
+    """
+    Subscribe to new transactions for the address and to new blocks
+    Returns the connection, or None if push notifications aren't available
+    """
+    if websocket is None:
+        logger.warning("Push mode needs the 'websocket-client' package, falling back to polling")
+        print("\nNote: Install 'websocket-client' to use --push: pip install websocket-client")
+        return None
+    
+    try:
+        ws = websocket.create_connection(PUSH_URL, timeout=30)
+        ws.send(json.dumps({"op": "addr_sub", "addr": address}))
+        ws.send(json.dumps({"op": "blocks_sub"}))
+        logger.info("Subscribed to push notifications for %s", address)
+        return ws
+    except Exception as e:
+        logger.warning("Could not open push connection (%s), falling back to polling", e)
+        return None
+
+def wait_for_push(ws, timeout):
+    """
+    Block until the push connection reports a transaction or block, or until timeout
+    Returns True if a notification arrived; raises ConnectionError if the connection dropped
+    """
+    ws.settimeout(timeout)
+    try:
+        message = ws.recv()
+    except websocket.WebSocketTimeoutException:
+        return False
+    except Exception as e:
+        raise ConnectionError(e)
+    
+    if not message:
+        raise ConnectionError("push connection closed")
+    op = json.loads(message).get('op')
+    logger.info("Push notification received: %s", op)
+    return op in ('utx', 'block')
+
+def monitor_wallet(wallet, destination_address, required_confirmations=3, check_interval=60, push=False,
+                   force_scan_every=10):
     """
     Monitor the wallet for incoming transactions
     Once a transaction is confirmed, forward the funds to the destination address
+    With push set, wait for transaction/block notifications instead of polling
+    The wallet is only updated on new blocks, or at least every force_scan_every polls
     """
-    wallet_address = wallet.get_key().address
-    logger.info(f"Monitoring wallet for transactions. Send Bitcoin to: {wallet_address}")
+    receive_key = wallet.get_key()
+    wallet_address = receive_key.address
+    logger.info("Monitoring wallet for transactions. Send Bitcoin to: %s", wallet_address)
     print(f"\n=== WALLET ADDRESS TO RECEIVE FUNDS ===")
     print(f"{wallet_address}")
     print(f"======================================")
@@ -119,120 +337,333 @@ def monitor_wallet(wallet, destination_address, required_confirmations=3, check_
     
     service = Service(network='bitcoin')
     
-    # Keep track of transactions we've processed
-    processed_txs = set()
+    # Keep track of UTXOs we've processed, including those handled by earlier runs
+    processed_txs = SeenTxs()
+    utxo_cache = load_utxo_cache()
+    for utxo_key in utxo_cache:
+        processed_txs.add(utxo_key)
+    
+    update_count = 0
+    polls_since_update = 0
+    last_seen_height = None
+    force_update = True
+    ws = None
+    show_status = sys.stdout.isatty()
+    last_status = 0.0
+    utxo_getters = None
     
     while True:
+        scan_started = time.monotonic()
         try:
-            # Update wallet with latest blockchain information
-            wallet.scan()
+            # One blockcount call per poll; confirmations are derived from
+            # each UTXO's block height instead of being looked up per UTXO
+            try:
+                tip_height = service.blockcount()
+            except Exception as e:
+                logger.warning("Could not get current block height: %s", e)
+                tip_height = None
+            
+            # Nothing can confirm until a new block arrives, so only update the
+            # wallet when the tip moved, a push notification came in, or
+            # force_scan_every polls have passed without an update
+            polls_since_update += 1
+            if (force_update or tip_height is None or tip_height != last_seen_height
+                    or polls_since_update >= force_scan_every):
+                if update_count % FULL_SCAN_EVERY == 0:
+                    # Full scan on startup and every FULL_SCAN_EVERY updates to catch
+                    # funds sent to older addresses and drop spent outputs
+                    wallet.scan()
+                else:
+                    # Otherwise only fetch outputs new to the receiving address
+                    wallet.utxos_update(key_id=receive_key.key_id, rescan_all=False)
+                update_count += 1
+                polls_since_update = 0
+                last_seen_height = tip_height
+                force_update = False
+            
+            cache_changed = bool(tip_height) and prune_utxo_cache(utxo_cache, tip_height)
+            
+            # Confirmed UTXOs to forward as (utxo_key, value, amount, fee)
+            to_forward = []
+            tx_fee = None
             
             # Check for new unspent outputs (received transactions)
-            for utxo in wallet.utxos():
-                # Handle both object and dictionary format
-                try:
-                    # Try object format first
-                    tx_id = utxo.txid if hasattr(utxo, 'txid') else utxo.transaction.hash
-                    confirmations = utxo.confirmations if hasattr(utxo, 'confirmations') else utxo.transaction.confirmations
-                    value = utxo.value
-                except AttributeError:
-                    # If above fails, try dictionary format
-                    tx_id = utxo['txid'] if 'txid' in utxo else utxo['tx_hash']
-                    confirmations = utxo['confirmations']
-                    value = utxo['value']
+            utxos = wallet.utxos()
+            if utxos:
+                if utxo_getters is None:
+                    # The UTXO layout depends on the bitcoinlib version, so work it out once
+                    utxo_getters = build_utxo_getters(utxos[0])
+                get_txid, get_output_n, get_confirmations, get_value, get_block_height = utxo_getters
+            
+            for utxo in utxos:
+                tx_id = get_txid(utxo)
                 
-                # Skip if we've already processed this transaction
-                if tx_id in processed_txs:
+                # Skip if we've already processed this output
+                utxo_key = f"{tx_id}:{get_output_n(utxo)}"
+                if utxo_key in processed_txs or utxo_key in utxo_cache:
                     continue
                 
+                confirmations = get_confirmations(utxo)
+                value = get_value(utxo)
+                block_height = get_block_height(utxo)
+                if tip_height and block_height:
+                    confirmations = tip_height - block_height + 1
+                
                 # Log and display transaction info
-                logger.info(f"Found transaction {tx_id} with {confirmations} confirmations")
+                logger.info("Found transaction %s with %s confirmations", tx_id, confirmations)
                 print(f"Found transaction: {tx_id}")
                 print(f"  Amount: {value / 1e8:.8f} BTC")
                 print(f"  Confirmations: {confirmations}/{required_confirmations}")
                 
                 if confirmations >= required_confirmations:
-                    # Calculate transaction fee based on current network conditions
-                    tx_fee = calculate_transaction_fee(service)
+                    # Transaction fee based on current network conditions, only
+                    # looked up once something needs forwarding
+                    if tx_fee is None:
+                        tx_fee = calculate_transaction_fee(service)
                     
                     # Create and send transaction to forward funds
                     if value > tx_fee:
                         amount_to_forward = value - tx_fee
-                        logger.info(f"Forwarding {amount_to_forward} satoshis to {destination_address}")
+                        logger.info("Forwarding %s satoshis to %s", amount_to_forward, destination_address)
                         print(f"Forwarding {amount_to_forward / 1e8:.8f} BTC to {destination_address}")
                         print(f"  Network fee: {tx_fee / 1e8:.8f} BTC")
                         
-                        forward_funds(wallet, destination_address, amount_to_forward, tx_fee)
-                        processed_txs.add(tx_id)
+                        to_forward.append((utxo_key, value, amount_to_forward, tx_fee))
                     else:
-                        logger.warning(f"Transaction value ({value}) is too small to cover fee ({tx_fee})")
+                        logger.warning("Transaction value (%s) is too small to cover fee (%s)", value, tx_fee)
                         print(f"Transaction value is too small to cover network fee. Skipping.")
-                        processed_txs.add(tx_id)
+                        processed_txs.add(utxo_key)
+                        utxo_cache[utxo_key] = {'value': value, 'status': 'dust', 'height': tip_height}
+                        cache_changed = True
+            
+            if to_forward:
+                # The wallet's database session isn't thread-safe, so send one at a time
+                for utxo_key, value, amount, fee in to_forward:
+                    result = forward_funds(wallet, destination_address, amount, fee, service)
+                    if result is False:
+                        # Inputs already spent; the next wallet update drops them
+                        continue
+                    if result is None:
+                        # The fee may have been too low; re-estimate and retry next poll
+                        invalidate_fee_cache()
+                        continue
+                    processed_txs.add(utxo_key)
+                    utxo_cache[utxo_key] = {'value': value, 'status': 'forwarded', 'height': tip_height}
+                    cache_changed = True
+            
+            if cache_changed:
+                save_utxo_cache(utxo_cache)
+            
+            if push and ws is None:
+                ws = open_push_connection(wallet_address)
+                if websocket is None:
+                    push = False  # Not installed, so keep polling
+            
+            # Only redraw the status line on a terminal, and not more than
+            # once every STATUS_MIN_INTERVAL seconds
+            status_due = show_status and time.monotonic() - last_status >= STATUS_MIN_INTERVAL
+            
+            if ws is not None:
+                # Sleep until something happens on the address or the chain
+                if status_due:
+                    sys.stdout.write(PUSH_STATUS % time.strftime('%H:%M:%S'))
+                    sys.stdout.flush()
+                    last_status = time.monotonic()
+                try:
+                    force_update = wait_for_push(ws, PUSH_MAX_WAIT)
+                except ConnectionError as e:
+                    logger.warning("Push connection lost (%s), polling until it can be reopened", e)
+                    ws.close()
+                    ws = None
+                    time.sleep(check_interval)
+                if status_due:
+                    sys.stdout.write(CLEAR_STATUS)
+                continue
             
-            # Wait before checking again
-            sys.stdout.write(f"\rLast checked: {time.strftime('%H:%M:%S')}. Checking again in {check_interval} seconds...")
-            sys.stdout.flush()
-            time.sleep(check_interval)
-            sys.stdout.write("\r" + " " * 80 + "\r")  # Clear line
+            # Wait before checking again, minus the time this poll already took,
+            # so slow scans don't stretch the polling period
+            wait_time = max(0, check_interval - (time.monotonic() - scan_started))
+            if status_due:
+                sys.stdout.write(POLL_STATUS % (time.strftime('%H:%M:%S'), wait_time))
+                sys.stdout.flush()
+                last_status = time.monotonic()
+            time.sleep(wait_time)
+            if status_due:
+                sys.stdout.write(CLEAR_STATUS)
             
         except Exception as e:
-            logger.error(f"Error in monitoring loop: {e}")
+            logger.error("Error in monitoring loop: %s", e)
             print(f"Error occurred: {e}")
             print(f"Retrying in {check_interval} seconds...")
             time.sleep(check_interval)  # Still wait before retrying
 
+def build_utxo_getters(sample):
+    """
+    Pick field accessors matching the UTXO layout of this bitcoinlib version,
+    so UTXOs don't have to be probed attribute by attribute
+    Returns getters for (txid, output_n, confirmations, value, block_height);
+    the block height getter returns None if it's unconfirmed or unknown
+    """
+    if isinstance(sample, dict):
+        return (
+            itemgetter('txid' if 'txid' in sample else 'tx_hash'),
+            lambda utxo: utxo.get('output_n', 0),
+            itemgetter('confirmations'),
+            itemgetter('value'),
+            lambda utxo: utxo.get('block_height'),
+        )
+    
+    if hasattr(sample, 'block_height'):
+        get_block_height = attrgetter('block_height')
+    elif hasattr(sample, 'transaction'):
+        get_block_height = lambda utxo: getattr(utxo.transaction, 'block_height', None)
+    else:
+        get_block_height = lambda utxo: None
+    
+    return (
+        attrgetter('txid' if hasattr(sample, 'txid') else 'transaction.hash'),
+        attrgetter('output_n') if hasattr(sample, 'output_n') else (lambda utxo: 0),
+        attrgetter('confirmations' if hasattr(sample, 'confirmations') else 'transaction.confirmations'),
+        attrgetter('value'),
+        get_block_height,
+    )
+
+def invalidate_fee_cache():
+    """
+    Forget the cached fee so the next calculation asks the service again
+    """
+    _fee_cache.clear()
+
 def calculate_transaction_fee(service):
     """
     Calculate a reasonable transaction fee based on current network conditions
-    Returns fee in satoshis
+    Returns fee in satoshis; estimates are reused for FEE_CACHE_TTL seconds
     """
+    cached = _fee_cache.get('fee')
+    if cached and time.monotonic() - cached[0] < FEE_CACHE_TTL:
+        return cached[1]
+    
     try:
         # Try to get fee estimation from service
         fee_per_kb = service.estimatefee(4)  # Targeting confirmation within 4 blocks
-        logger.info(f"Fee estimation from service: {fee_per_kb} BTC/KB")
+        logger.info("Fee estimation from service: %s BTC/KB", fee_per_kb)
         
         # The API returns fee in BTC per KB
         # Check if the fee is already in satoshis or if it's in BTC
         if fee_per_kb > 0.1:  # If fee is > 0.1 BTC/KB, something is wrong
-            logger.warning(f"Fee estimation too high ({fee_per_kb} BTC/KB), using fallback")
+            logger.warning("Fee estimation too high (%s BTC/KB), using fallback", fee_per_kb)
             fee_per_kb = 0.0001  # Fallback to 0.0001 BTC/KB
         
         # Convert to satoshis (1 BTC = 100,000,000 satoshis)
-        # Assuming a typical transaction size of ~250 bytes
+        # Assuming a typical transaction size of ~250 bytes; integer math,
+        # rounded up so the fee never falls a satoshi short of the rate
         tx_size = 250
-        tx_fee = int(fee_per_kb * 1e8 * tx_size / 1024)
+        sat_per_kb = int(round(fee_per_kb * 100_000_000))
+        tx_fee = (sat_per_kb * tx_size + 1023) // 1024
         
         # Sanity check - cap maximum fee at 25,000 satoshis (0.00025 BTC)
         max_fee = 25000  # 0.00025 BTC
         if tx_fee > max_fee:
-            logger.warning(f"Calculated fee too high ({tx_fee} satoshis), capping at {max_fee}")
+            logger.warning("Calculated fee too high (%s satoshis), capping at %s", tx_fee, max_fee)
             tx_fee = max_fee
         
         # Ensure a minimum reasonable fee
         min_fee = 1000  # 1000 satoshis minimum (0.00001 BTC)
         tx_fee = max(tx_fee, min_fee)
         
-        logger.info(f"Calculated transaction fee: {tx_fee} satoshis")
+        logger.info("Calculated transaction fee: %s satoshis", tx_fee)
+        _fee_cache['fee'] = (time.monotonic(), tx_fee)
         return tx_fee
     except Exception as e:
-        logger.error(f"Error calculating fee: {e}")
+        logger.error("Error calculating fee: %s", e)
         # Return a conservative default fee if estimation fails
         return 10000  # 10,000 satoshis as fallback
 
-def forward_funds(wallet, destination_address, amount, fee):
+def list_unspent(service, address):
+    """
+    Page through the service's UTXOs for an address
+    Returns the (txid, output_n) pairs and whether the listing is complete
+    """
+    unspent = set()
+    after_txid = ''
+    for _ in range(UTXO_MAX_PAGES):
+        page = service.getutxos(address, after_txid=after_txid, limit=UTXO_PAGE_LIMIT)
+        unspent.update((utxo['txid'], utxo['output_n']) for utxo in page)
+        # The service clears 'complete' when a page came back full
+        if getattr(service, 'complete', True) or not page:
+            return unspent, True
+        if page[-1]['txid'] == after_txid:
+            break  # Not making progress
+        after_txid = page[-1]['txid']
+    return unspent, False
+
+def find_spent_inputs(service, tx):
+    """
+    Check the inputs of a transaction against the service's current UTXO set
+    Returns the (txid, output_n) pairs that are no longer unspent, and those
+    that couldn't be checked because their address's UTXO list is incomplete
+    """
+    unspent = set()
+    incomplete = set()
+    for address in {inp.address for inp in tx.inputs}:
+        try:
+            address_unspent, complete = list_unspent(service, address)
+        except Exception as e:
+            logger.warning("Could not list UTXOs for %s: %s", address, e)
+            address_unspent, complete = set(), False
+        unspent |= address_unspent
+        if not complete:
+            incomplete.add(address)
+    
+    spent = []
+    unknown = []
+    for inp in tx.inputs:
+        prev_txid = getattr(inp, 'prev_txid', None) or inp.prev_hash
+        if isinstance(prev_txid, bytes):
+            prev_txid = prev_txid.hex()
+        output_n = getattr(inp, 'output_n_int', None)
+        if output_n is None:
+            output_n = int.from_bytes(inp.output_n, 'big')
+        if (prev_txid, output_n) in unspent:
+            continue
+        if inp.address in incomplete:
+            unknown.append((prev_txid, output_n))
+        else:
+            spent.append((prev_txid, output_n))
+    return spent, unknown
+
+def forward_funds(wallet, destination_address, amount, fee, service=None):
     """
     Send funds from the wallet to the destination address
+    If a service is given, the inputs are checked to still be unspent before broadcasting
+    Returns the transaction, False if its inputs were already spent, or None on error
     """
     try:
-        # Create transaction
-        tx = wallet.send_to(destination_address, amount, fee=fee)
+        if service is None:
+            # Create and send transaction
+            tx = wallet.send_to(destination_address, amount, fee=fee)
+        else:
+            # Create transaction, and don't broadcast it if an input was already spent
+            tx = wallet.transaction_create([(destination_address, amount)], fee=fee)
+            try:
+                spent, unknown = find_spent_inputs(service, tx)
+            except Exception as e:
+                logger.warning("Could not check transaction inputs, sending anyway: %s", e)
+                spent, unknown = [], []
+            if unknown:
+                logger.warning("Could not confirm inputs are unspent, sending anyway: %s", unknown)
+            if spent:
+                logger.error("Not sending transaction, inputs already spent: %s", spent)
+                print(f"\nNot sending transaction: {len(spent)} input(s) already spent")
+                return False
+            tx.sign()
+            tx.send()
+        
+        if getattr(tx, 'error', None):
+            raise Exception(tx.error)
         
         # Different versions of bitcoinlib use different attribute names for transaction ID
-        tx_id = None
-        for attr in ['hash', 'txid', 'tx_hash', 'id']:
-            if hasattr(tx, attr):
-                tx_id = getattr(tx, attr)
-                break
+        tx_id = getattr(tx, TX_ID_ATTR, None)
         
         if not tx_id and hasattr(tx, 'dict'):
             # Try accessing as dictionary if available
@@ -244,8 +675,7 @@ def forward_funds(wallet, destination_address, amount, fee):
             tx_str = str(tx)
             if "txid" in tx_str.lower():
                 # Try to extract ID from string representation
-                import re
-                match = re.search(r'(txid|hash|id)[\'"\s:=]+([a-fA-F0-9]{64})', tx_str, re.IGNORECASE)
+                match = _TXID_RE.search(tx_str)
                 if match:
                     tx_id = match.group(2)
             
@@ -253,14 +683,14 @@ def forward_funds(wallet, destination_address, amount, fee):
             if not tx_id:
                 tx_id = "Transaction sent (ID unavailable)"
                 
-        logger.info(f"Transaction sent! Transaction ID: {tx_id}")
+        logger.info("Transaction sent! Transaction ID: %s", tx_id)
         print(f"\nTransaction sent successfully!")
         print(f"  Transaction ID: {tx_id}")
         print(f"  Amount: {amount / 1e8:.8f} BTC")
         print(f"  Fee: {fee / 1e8:.8f} BTC")
         return tx
     except Exception as e:
-        logger.error(f"Error sending transaction: {e}")
+        logger.error("Error sending transaction: %s", e)
         print(f"\nError sending transaction: {e}")
         return None
 
@@ -268,45 +698,39 @@ def generate_qr_terminal(data):
     """
     Generate a QR code and display it in the terminal
     """
-    try:
-        import qrcode
-        from qrcode.main import QRCode
-
-        # Create QR code instance
-        qr = QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=1,
-            border=1,
-        )
-        
-        # Add data
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        # Print QR code to terminal - using ASCII characters
-        # Black modules are represented by ASCII block characters, white by spaces
-        modules = qr.get_matrix()
-        
-        print("\nQR Code for wallet address:")
-        print("-" * (len(modules[0]) * 2 + 4))
-        
-        for row in modules:
-            print("  ", end="")
-            for cell in row:
-                if cell:
-                    print("██", end="")
-                else:
-                    print("  ", end="")
-            print()
-            
-        print("-" * (len(modules[0]) * 2 + 4))
-        print(f"Address: {data}")
-        
-    except ImportError:
+    if _QR is None:
         logger.warning("QR code functionality unavailable. Install 'qrcode' for this feature.")
         print("\nNote: Install 'qrcode' package to display QR codes in terminal:")
         print("pip install qrcode")
+        return
+    
+    # Reset the shared QR code and add data
+    _QR.clear()
+    _QR.add_data(data)
+    _QR.make(fit=True)
+    
+    # Print QR code to terminal using Unicode half blocks, two module rows
+    # per line. Dark modules are drawn as blocks, light ones as spaces
+    modules = _QR.get_matrix()
+    width = len(modules[0])
+    
+    # Pad odd-sized matrices with a light row so every row has a partner
+    if np is not None:
+        matrix = np.asarray(modules, dtype=bool)
+        if len(matrix) % 2:
+            matrix = np.vstack([matrix, np.zeros((1, width), dtype=bool)])
+        glyphs = np.array(list(QR_HALF_BLOCKS))[matrix[0::2] + 2 * matrix[1::2]]
+        rows = ["  " + "".join(row) for row in glyphs]
+    else:
+        lower_rows = modules[1::2] + [[False] * width] * (len(modules) % 2)
+        rows = [
+            "  " + "".join([QR_HALF_BLOCKS[a + 2 * b] for a, b in zip(upper, lower)])
+            for upper, lower in zip(modules[::2], lower_rows)
+        ]
+    
+    # Emit the whole code in one write
+    border = "-" * (width + 4)
+    sys.stdout.write("\n".join(["\nQR Code for wallet address:", border] + rows + [border, f"Address: {data}"]) + "\n")
 
 def check_dependencies():
     """
@@ -319,9 +743,7 @@ def check_dependencies():
     except ImportError:
         missing.append("bitcoinlib")
     
-    try:
-        import qrcode
-    except ImportError:
+    if _QR is None:
         missing.append("qrcode")
     
     if missing:
@@ -349,6 +771,10 @@ def parse_arguments():
                         help='Name for the local wallet (default: forwarding_wallet)')
     parser.add_argument('--testnet', action='store_true',
                         help='Use Bitcoin testnet instead of mainnet')
+    parser.add_argument('--force-scan-every', type=int, default=10,
+                        help='Update the wallet at least every N polls even if no new block arrived (default: 10)')
+    parser.add_argument('--push', action='store_true',
+                        help='Wait for transaction and block notifications instead of polling (needs websocket-client)')
     return parser.parse_args()
 
 def main():
@@ -401,7 +827,9 @@ def main():
     try:
         monitor_wallet(wallet, destination_address, 
                      required_confirmations=args.confirmations,
-                     check_interval=args.interval)
+                     check_interval=args.interval,
+                     push=args.push,
+                     force_scan_every=args.force_scan_every)
     except KeyboardInterrupt:
         print("\nExiting...")
     
@@ -12,7 +12,7 @@ SECURITY WARNING: Private keys give full access to your funds.
 """
 
 import sys
-from bitcoinlib.wallets import Wallet, wallet_exists, wallets_list
+import operator
 import getpass
 
 def list_available_wallets():
@@ -24,6 +24,7 @@ def list_available_wallets():
     print(f"{'Wallet Name':<30} {'Network':<10} {'Status'}")
     print("-" * 60)
     
+    from bitcoinlib.wallets import wallets_list
     wallets = wallets_list()
     if not wallets:
         print("No wallets found in database")
@@ -31,11 +32,8 @@ def list_available_wallets():
     
     for wallet_info in wallets:
         # Get network name using different possible keys
-        network = "Unknown"
-        for key in ['network_name', 'network', 'scheme']:
-            if key in wallet_info:
-                network = wallet_info[key]
-                break
+        network = next((wallet_info[key] for key in ('network_name', 'network', 'scheme')
+                        if key in wallet_info), "Unknown")
         
         name = wallet_info.get('name', 'Unknown')
         print(f"{name:<30} {network:<10} {'Active'}")
@@ -47,15 +45,17 @@ def open_wallet(wallet_name):
     """
     Open a specific wallet and return it
     """
+    from bitcoinlib.wallets import Wallet, wallet_exists
     if not wallet_exists(wallet_name):
         print(f"Wallet '{wallet_name}' does not exist")
         return None
     
     try:
         wallet = Wallet(wallet_name)
-        # Update wallet with latest blockchain information
+        # Update wallet with latest blockchain information. Refreshing the UTXOs
+        # of the keys already in the wallet is much cheaper than a full scan
         try:
-            wallet.scan()
+            wallet.utxos_update()
         except:
             print("Warning: Could not scan wallet for latest transactions")
         return wallet
@@ -63,6 +63,16 @@ def open_wallet(wallet_name):
         print(f"Error opening wallet: {e}")
         return None
 
+def utxo_address_getter(sample):
+    """
+    Return a function reading the address from UTXOs shaped like sample
+    """
+    if isinstance(sample, dict):
+        return operator.itemgetter('address')
+    if hasattr(sample, 'address'):
+        return operator.attrgetter('address')
+    return operator.attrgetter('key.address')
+
 def export_private_keys(wallet):
     """
     Export private keys in WIF format
@@ -78,41 +88,49 @@ def export_private_keys(wallet):
     print("Keys with balances will be marked with [HAS FUNDS]")
     print("-" * 75)
     
-    # Try to get UTXOs to identify which addresses have funds
+    # Fetch the UTXOs once to identify which addresses have funds
     addresses_with_funds = set()
     try:
         utxos = wallet.utxos()
-        for utxo in utxos:
-            try:
-                if hasattr(utxo, 'address'):
-                    addresses_with_funds.add(utxo.address)
-                elif hasattr(utxo, 'key') and hasattr(utxo.key, 'address'):
-                    addresses_with_funds.add(utxo.key.address)
-            except:
-                pass
+        if utxos:
+            # All UTXOs share one layout, so pick the address accessor once
+            get_address = utxo_address_getter(utxos[0])
+            for utxo in utxos:
+                try:
+                    addresses_with_funds.add(get_address(utxo))
+                except:
+                    pass
     except:
         print("Warning: Could not check which addresses have funds")
     
-    # Get all keys
+    # Read address, path and WIF straight from the key records rather than
+    # building a key object for each one
+    try:
+        keys = wallet.keys(include_private=True, as_dict=True)
+    except Exception as e:
+        print(f"Error reading keys: {e}")
+        keys = []
+    
     keys_exported = 0
-    for key in wallet.keys():
+    for key in keys:
         try:
-            address = key.address
-            path = key.path
+            address = key['address']
+            path = key['path']
             
             # Get the private key in WIF format
-            try:
-                wif = key.wif
-                has_funds = address in addresses_with_funds
-                flag = " [HAS FUNDS]" if has_funds else ""
-                
-                print(f"Address: {address}{flag}")
-                print(f"Path: {path}")
-                print(f"WIF Private Key: {wif}")
-                print("-" * 75)
-                keys_exported += 1
-            except:
+            wif = key.get('wif')
+            if not wif:
                 print(f"WARNING: Could not export private key for {address}")
+                continue
+            
+            has_funds = address in addresses_with_funds
+            flag = " [HAS FUNDS]" if has_funds else ""
+            
+            print(f"Address: {address}{flag}")
+            print(f"Path: {path}")
+            print(f"WIF Private Key: {wif}")
+            print("-" * 75)
+            keys_exported += 1
         except Exception as e:
             print(f"Error processing key: {e}")
     
@@ -11,8 +11,13 @@ Prerequisites:
 """
 
 import sys
+import argparse
+import time
+from decimal import Decimal
 import logging
-from bitcoinlib.wallets import Wallet, wallet_exists, wallets_list
+import operator
+from collections import defaultdict
+from importlib.metadata import version
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +26,100 @@ logging.basicConfig(
 )
 logger = logging.getLogger("WalletRecovery")
 
+# Wallet, UTXO and transaction tables go through their own logger, printed
+# as-is to stdout, so they can be redirected or switched off (--no-tables)
+table_logger = logging.getLogger("WalletRecovery.tables")
+_table_handler = logging.StreamHandler(sys.stdout)
+_table_handler.setFormatter(logging.Formatter('%(message)s'))
+table_logger.addHandler(_table_handler)
+table_logger.propagate = False
+
+SATOSHI_PER_BTC = 100_000_000
+
+def _fmt_btc(sat):
+    """
+    Format an amount in satoshis as BTC with 8 decimals, using integer math only
+    """
+    sign = "-" if sat < 0 else ""
+    sat = abs(sat)
+    return f"{sign}{sat // SATOSHI_PER_BTC}.{sat % SATOSHI_PER_BTC:08d}"
+
+# Fee estimates per network are reused for this many seconds
+FEE_CACHE_TTL = 60
+_fee_cache = {}
+
+# (address, path) pairs per wallet_id, so the HD key tree is only walked once
+_keys_cache = {}
+
+# Transaction ID attribute: 'txid' from bitcoinlib 0.6 on, 'hash' before.
+# Read from package metadata so bitcoinlib itself is only imported when needed
+try:
+    TX_ID_ATTR = 'txid' if tuple(map(int, version('bitcoinlib').split('.')[:2])) >= (0, 6) else 'hash'
+except Exception:
+    TX_ID_ATTR = 'txid'
+
+# Attribute names used by different bitcoinlib versions, most likely first
+UTXO_FIELDS = {
+    'txid': ['txid', 'tx_hash', 'hash'],
+    'output_n': ['output_n'],
+    'value': ['value'],
+    'confirmations': ['confirmations'],
+    'address': ['address', 'key.address'],
+}
+TX_FIELDS = {
+    'txid': ['txid', 'hash', 'tx_hash', 'id'],
+    'input_total': ['input_total'],
+    'output_total': ['output_total'],
+    'status': ['status'],
+    'confirmations': ['confirmations'],
+}
+
+def _attr_or_none(name):
+    """
+    Return a getter for a (possibly dotted) attribute name that gives None
+    instead of raising when the attribute is missing
+    """
+    parts = name.split('.')
+    if len(parts) == 1:
+        return lambda item: getattr(item, name, None)
+    
+    def getter(item):
+        for part in parts:
+            item = getattr(item, part, None)
+            if item is None:
+                return None
+        return item
+    return getter
+
+def _resolve_getters(sample, attr_groups, defaults=None):
+    """
+    Pick an accessor for each field from the first name in its group that the
+    sample object (or dict) has, so a collection of same-shaped items only has
+    to be probed once. Fields with no match get a getter returning their
+    default, or None if no default is given. The getters return None for
+    items missing the key or attribute, so callers can skip malformed entries
+    """
+    defaults = defaults or {}
+    getters = {}
+    for field, names in attr_groups.items():
+        getters[field] = None
+        for name in names:
+            if isinstance(sample, dict):
+                if name not in sample:
+                    continue
+                getter = operator.methodcaller('get', name)
+            else:
+                try:
+                    operator.attrgetter(name)(sample)
+                except AttributeError:
+                    continue
+                getter = _attr_or_none(name)
+            getters[field] = getter
+            break
+        if getters[field] is None and field in defaults:
+            getters[field] = lambda item, default=defaults[field]: default
+    return getters
+
 def list_available_wallets():
     """
     List all available wallets in the bitcoinlib database
@@ -30,6 +129,7 @@ def list_available_wallets():
     print(f"{'Wallet Name':<30} {'Network':<10} {'Status'}")
     print("-" * 60)
     
+    from bitcoinlib.wallets import wallets_list
     wallets = wallets_list()
     if not wallets:
         print("No wallets found in database")
@@ -37,11 +137,8 @@ def list_available_wallets():
     
     for wallet_info in wallets:
         # Get network name using different possible keys
-        network = "Unknown"
-        for key in ['network_name', 'network', 'scheme']:
-            if key in wallet_info:
-                network = wallet_info[key]
-                break
+        network = next((wallet_info[key] for key in ('network_name', 'network', 'scheme')
+                        if key in wallet_info), "Unknown")
         
         name = wallet_info.get('name', 'Unknown')
         print(f"{name:<30} {network:<10} {'Active'}")
@@ -49,10 +146,42 @@ def list_available_wallets():
     print("-" * 60)
     return True
 
+def _wallet_addresses(wallet):
+    """
+    Return the wallet's (address, path) pairs, reading the keys from the
+    wallet only the first time
+    """
+    addresses = _keys_cache.get(wallet.wallet_id)
+    if addresses is None:
+        addresses = [(key.address, key.path) for key in wallet.keys()]
+        _keys_cache[wallet.wallet_id] = addresses
+    return addresses
+
+def _get_network_name(wallet):
+    """
+    Get the wallet's network name (different library versions use different attributes)
+    """
+    return getattr(getattr(wallet, 'network', None), 'name', None) or getattr(wallet, 'network_name', 'Unknown')
+
+def _fast_sync(wallet):
+    """
+    Refresh only the wallet's UTXOs, which is all that's needed to show the
+    balance and send funds. Falls back to a full scan (including transaction
+    history) if the UTXO-only update isn't available or fails
+    """
+    utxos_update = getattr(wallet, 'utxos_update', None)
+    if utxos_update is not None:
+        try:
+            return utxos_update()
+        except Exception as e:
+            print(f"Warning: UTXO update failed ({e}), doing a full scan")
+    return wallet.scan()
+
 def open_wallet(wallet_name):
     """
     Open a specific wallet and return it
     """
+    from bitcoinlib.wallets import Wallet, wallet_exists
     if not wallet_exists(wallet_name):
         print(f"Wallet '{wallet_name}' does not exist")
         return None
@@ -60,7 +189,7 @@ def open_wallet(wallet_name):
     try:
         wallet = Wallet(wallet_name)
         # Update wallet with latest blockchain information
-        wallet.scan()
+        _fast_sync(wallet)
         return wallet
     except Exception as e:
         print(f"Error opening wallet: {e}")
@@ -70,123 +199,151 @@ def list_utxos(wallet):
     """
     Directly examine the UTXOs (Unspent Transaction Outputs) in the wallet
     """
-    print("\nUnspent Transaction Outputs (UTXOs):")
-    print("-" * 80)
-    print(f"{'TXID':<65} {'Output #':<8} {'Value (BTC)':<12} {'Confirmations'}")
-    print("-" * 80)
+    if not table_logger.isEnabledFor(logging.INFO):
+        return False
+    
+    rows = [
+        "\nUnspent Transaction Outputs (UTXOs):",
+        "-" * 80,
+        f"{'TXID':<65} {'Output #':<8} {'Value (BTC)':<12} {'Confirmations'}",
+        "-" * 80,
+    ]
     
     try:
         utxos = wallet.utxos()
         if not utxos:
-            print("No unspent outputs found")
+            rows.append("No unspent outputs found")
+            table_logger.info("\n".join(rows))
             return False
         
-        total_value = 0
+        # Work out how to read UTXO data from the first one
+        getters = _resolve_getters(utxos[0], UTXO_FIELDS, {
+            'txid': "Unknown", 'output_n': "?", 'value': 0, 'confirmations': "?", 'address': None,
+        })
+        get_txid = getters['txid']
+        get_output_n = getters['output_n']
+        get_value = getters['value']
+        get_confirmations = getters['confirmations']
+        
+        # Read every UTXO's fields in one pass, then total and format them
+        utxo_rows = []
         for utxo in utxos:
-            # Try different ways to access UTXO data
-            try:
-                txid = utxo.txid if hasattr(utxo, 'txid') else (
-                    utxo.tx_hash if hasattr(utxo, 'tx_hash') else 
-                    (utxo.hash if hasattr(utxo, 'hash') else "Unknown"))
-                
-                output_n = utxo.output_n if hasattr(utxo, 'output_n') else "?"
-                value = utxo.value if hasattr(utxo, 'value') else 0
-                confirmations = utxo.confirmations if hasattr(utxo, 'confirmations') else "?"
-                
-                print(f"{txid:<65} {output_n:<8} {value / 1e8:<12.8f} {confirmations}")
-                total_value += value
-            except Exception as e:
-                print(f"Error accessing UTXO data: {e}")
+            txid = get_txid(utxo)
+            value = get_value(utxo)
+            # Only skip items missing a field the rest of the UTXOs have
+            if not txid or value is None:
+                logger.warning("Skipping malformed UTXO: %r", utxo)
+                continue
+            utxo_rows.append((txid, get_output_n(utxo), value, get_confirmations(utxo)))
+        total_value = sum(row[2] for row in utxo_rows)
         
-        print("-" * 80)
-        print(f"Total value: {total_value / 1e8:.8f} BTC")
+        # Build the table and log it in one go
+        rows.extend(
+            f"{txid:<65} {output_n:<8} {_fmt_btc(value):<12} {confirmations}"
+            for txid, output_n, value, confirmations in utxo_rows
+        )
+        rows.append("-" * 80)
+        rows.append(f"Total value: {_fmt_btc(total_value)} BTC")
+        table_logger.info("\n".join(rows))
         return True
     except Exception as e:
-        print(f"Error listing UTXOs: {e}")
+        table_logger.info("\n".join(rows))
+        logger.error("Error listing UTXOs: %s", e)
         return False
 
-def display_wallet_info(wallet):
+def display_wallet_info(wallet, scanned=True):
     """
-    Display wallet information including addresses and balance
+    Display wallet information including addresses and balance, and return
+    the total balance in satoshis
+    Pass scanned=False to rescan first, e.g. after sending a transaction
     """
     if not wallet:
-        return
+        return 0
     
-    print("\nWallet Information:")
-    print(f"Name: {wallet.name}")
-    print(f"ID: {wallet.wallet_id}")
+    show_tables = table_logger.isEnabledFor(logging.INFO)
     
-    # Get network name (different library versions use different attributes)
-    network_name = "Unknown"
-    if hasattr(wallet, 'network') and hasattr(wallet.network, 'name'):
-        network_name = wallet.network.name
-    elif hasattr(wallet, 'network_name'):
-        network_name = wallet.network_name
-    print(f"Network: {network_name}")
+    network_name = _get_network_name(wallet)
+    table_logger.info("\nWallet Information:\nName: %s\nID: %s\nNetwork: %s",
+                      wallet.name, wallet.wallet_id, network_name)
     
-    # Try to update wallet with latest blockchain information
-    try:
-        wallet.scan()
-        print("Wallet updated with latest blockchain information")
-    except Exception as e:
-        print(f"Warning: Could not scan wallet: {e}")
+    # Only rescan if the caller hasn't just updated the wallet
+    if not scanned:
+        try:
+            wallet.scan()
+            logger.info("Wallet updated with latest blockchain information")
+        except Exception as e:
+            logger.warning("Could not scan wallet: %s", e)
     
     # Get total wallet balance
     try:
         total_balance = wallet.balance()
-        print(f"\nTotal Wallet Balance: {total_balance / 1e8:.8f} BTC")
+        logger.info("Total Wallet Balance: %s BTC", _fmt_btc(total_balance))
     except Exception as e:
         total_balance = 0
-        print(f"Warning: Could not get wallet balance: {e}")
+        logger.warning("Could not get wallet balance: %s", e)
     
-    # Display addresses
-    print("\nAddresses:")
+    # Everything below only feeds the address table
+    if not show_tables:
+        return total_balance
     
-    # Display each key/address
-    for key in wallet.keys():
-        address = key.address
-        path = key.path
-        
-        # Try different methods to get address balance
-        address_balance = 0
+    # Fetch the wallet's UTXOs once and total them by address, instead of
+    # asking for each address's UTXOs separately
+    addresses = _wallet_addresses(wallet)
+    balances = defaultdict(int)
+    # An empty wallet has nothing to look up, so skip the UTXO queries
+    if total_balance > 0:
         try:
-            # Try method 1: utxos_address if it exists
-            if hasattr(wallet, 'utxos_address'):
-                balance_data = wallet.utxos_address(address, as_dict=True)
-                address_balance = sum([utxo['value'] for utxo in balance_data]) if balance_data else 0
-            else:
-                # Try method 2: filter utxos by address
-                try:
-                    all_utxos = wallet.utxos()
-                    # Different UTXO object structures in different library versions
-                    for utxo in all_utxos:
-                        utxo_address = None
-                        # Try different attribute accesses for UTXO address
-                        if hasattr(utxo, 'address'):
-                            utxo_address = utxo.address
-                        elif hasattr(utxo, 'key') and hasattr(utxo.key, 'address'):
-                            utxo_address = utxo.key.address
-                        
-                        if utxo_address == address:
-                            # Try different attribute accesses for UTXO value
-                            if hasattr(utxo, 'value'):
-                                address_balance += utxo.value
-                            elif isinstance(utxo, dict) and 'value' in utxo:
-                                address_balance += utxo['value']
-                except Exception as e:
-                    print(f"  Warning: Could not get UTXOs: {e}")
+            utxos = wallet.utxos()
+            if utxos:
+                # Different UTXO structures in different library versions
+                getters = _resolve_getters(utxos[0], UTXO_FIELDS, {'address': None, 'value': None})
+                get_address = getters['address']
+                get_value = getters['value']
+                for utxo in utxos:
+                    value = get_value(utxo)
+                    if value is None:
+                        logger.warning("Skipping malformed UTXO: %r", utxo)
+                        continue
+                    balances[get_address(utxo)] += value
         except Exception as e:
-            address_balance = 0
-            print(f"  Warning: Could not get balance for {address}: {e}")
-        
-        print(f"- {address} (Path: {path})")
-        print(f"  Balance: {address_balance / 1e8:.8f} BTC")
+            logger.warning("Could not get UTXOs: %s", e)
+    
+    # Display each key/address
+    rows = ["\nAddresses:"]
+    for address, path in addresses:
+        rows.append(f"- {address} (Path: {path})")
+        rows.append(f"  Balance: {_fmt_btc(balances.get(address, 0))} BTC")
+    table_logger.info("\n".join(rows))
     
     # List UTXOs directly
     if total_balance > 0:
-        print("\nNOTE: Your wallet has a balance but it's not showing in individual addresses.")
-        print("This is a common issue with the bitcoinlib library. Let's examine the UTXOs directly:")
+        table_logger.info("\nNOTE: Your wallet has a balance but it's not showing in individual addresses.\n"
+                          "This is a common issue with the bitcoinlib library. Let's examine the UTXOs directly:")
         list_utxos(wallet)
+    
+    return total_balance
+
+def _fetch_fee_per_kb(network):
+    """
+    Get the fee estimate for the network in BTC/KB, reusing it for FEE_CACHE_TTL
+    seconds. If the service fails, the last good estimate is returned instead
+    """
+    cached = _fee_cache.get(network)
+    if cached and time.monotonic() - cached[0] < FEE_CACHE_TTL:
+        return cached[1]
+    
+    try:
+        from bitcoinlib.services.services import Service
+        fee_per_kb = Service(network=network).estimatefee(4)  # Target 4 blocks
+    except Exception as e:
+        if not cached:
+            raise
+        print(f"Error estimating fee: {e}")
+        print("Using the last successful fee estimate")
+        return cached[1]
+    
+    _fee_cache[network] = (time.monotonic(), fee_per_kb)
+    return fee_per_kb
 
 def calculate_safe_transaction_fee(network='bitcoin'):
     """
@@ -194,9 +351,7 @@ def calculate_safe_transaction_fee(network='bitcoin'):
     Returns fee in satoshis
     """
     try:
-        from bitcoinlib.services.services import Service
-        service = Service(network=network)
-        fee_per_kb = service.estimatefee(4)  # Target 4 blocks
+        fee_per_kb = _fetch_fee_per_kb(network)
         
         # Log the raw estimation
         print(f"Raw fee estimation from service: {fee_per_kb} BTC/KB")
@@ -229,24 +384,26 @@ def calculate_safe_transaction_fee(network='bitcoin'):
         print("Using safe default fee")
         return 5000  # Safe default (0.00005 BTC)
 
-def send_transaction(wallet, to_address, amount=None, fee=None):
+def send_transaction(wallet, to_address, amount=None, fee=None, balance=None):
     """
     Send a transaction from the wallet
+    Pass the balance if it's already known to skip looking it up again
     """
     if not wallet:
         return
     
-    balance = wallet.balance()
+    if balance is None:
+        balance = wallet.balance()
     if balance <= 0:
         print("Wallet has zero balance")
         return
     
     # If fee is not specified, calculate a safe fee
     if fee is None:
-        fee = calculate_safe_transaction_fee(wallet.network.name)
+        fee = calculate_safe_transaction_fee(_get_network_name(wallet))
     
     # Show fee in both satoshis and BTC
-    print(f"\nTransaction fee: {fee} satoshis ({fee / 1e8:.8f} BTC)")
+    print(f"\nTransaction fee: {fee} satoshis ({_fmt_btc(fee)} BTC)")
     
     # Allow user to modify the fee if desired
     modify_fee = input("Would you like to modify the fee? (y/n): ").lower().strip()
@@ -256,7 +413,7 @@ def send_transaction(wallet, to_address, amount=None, fee=None):
             custom_fee = int(custom_fee_input)
             if 1000 <= custom_fee <= 25000:
                 fee = custom_fee
-                print(f"Using custom fee: {fee} satoshis ({fee / 1e8:.8f} BTC)")
+                print(f"Using custom fee: {fee} satoshis ({_fmt_btc(fee)} BTC)")
             else:
                 print("Fee must be between 1000-25000 satoshis. Using calculated fee.")
         except ValueError:
@@ -270,9 +427,9 @@ def send_transaction(wallet, to_address, amount=None, fee=None):
         print(f"Amount after fee deduction is too small: {amount} satoshis")
         return
     
-    print(f"\nPreparing to send {amount / 1e8:.8f} BTC to {to_address}")
-    print(f"Transaction fee: {fee / 1e8:.8f} BTC")
-    print(f"Total to be deducted from wallet: {(amount + fee) / 1e8:.8f} BTC")
+    print(f"\nPreparing to send {_fmt_btc(amount)} BTC to {to_address}")
+    print(f"Transaction fee: {_fmt_btc(fee)} BTC")
+    print(f"Total to be deducted from wallet: {_fmt_btc(amount + fee)} BTC")
     
     confirm = input("Confirm transaction? (y/n): ").lower().strip()
     if confirm != 'y':
@@ -282,18 +439,15 @@ def send_transaction(wallet, to_address, amount=None, fee=None):
     try:
         print("Sending transaction... This might take a few moments.")
         tx = wallet.send_to(to_address, amount, fee=fee)
+        # Sending may derive a new change key
+        _keys_cache.pop(wallet.wallet_id, None)
         
-        # Try to get transaction ID
-        tx_id = None
-        for attr in ['hash', 'txid', 'tx_hash', 'id']:
-            if hasattr(tx, attr):
-                tx_id = getattr(tx, attr)
-                break
+        tx_id = getattr(tx, TX_ID_ATTR, None)
         
         print(f"\nTransaction sent successfully!")
         print(f"Transaction ID: {tx_id or 'Unknown'}")
-        print(f"Amount: {amount / 1e8:.8f} BTC")
-        print(f"Fee: {fee / 1e8:.8f} BTC")
+        print(f"Amount: {_fmt_btc(amount)} BTC")
+        print(f"Fee: {_fmt_btc(fee)} BTC")
         
         print("\nPlease verify this transaction in a blockchain explorer.")
         return tx
@@ -301,18 +455,25 @@ def send_transaction(wallet, to_address, amount=None, fee=None):
         print(f"Error sending transaction: {e}")
         return None
 
-def display_wallet_transactions(wallet):
+def display_wallet_transactions(wallet, scanned=True):
     """
     Display recent transactions for the wallet including pending ones
+    Pass scanned=False to fetch the latest transaction history first
     """
-    print("\nRecent Transactions:")
-    print("-" * 80)
-    print(f"{'Transaction ID':<65} {'Type':<8} {'Amount':<15} {'Status'}")
-    print("-" * 80)
+    if not table_logger.isEnabledFor(logging.INFO):
+        return
     
+    # Table rows are collected and logged in one go
+    rows = [
+        "\nRecent Transactions:",
+        "-" * 80,
+        f"{'Transaction ID':<65} {'Type':<8} {'Amount':<15} {'Status'}",
+        "-" * 80,
+    ]
     try:
         # Scan wallet to ensure we have the latest transactions
-        wallet.scan()
+        if not scanned:
+            wallet.scan()
         
         # Try different ways to get transactions
         transactions = []
@@ -320,47 +481,70 @@ def display_wallet_transactions(wallet):
             try:
                 transactions = wallet.transactions()
             except Exception as e:
-                print(f"Warning: Error retrieving transactions: {e}")
+                logger.warning("Error retrieving transactions: %s", e)
         
         if not transactions:
-            print("No transactions found or unable to retrieve transaction history")
+            rows.append("No transactions found or unable to retrieve transaction history")
+            table_logger.info("\n".join(rows))
             return
         
+        # Work out which fields this library version provides from the first transaction
+        getters = _resolve_getters(transactions[0], TX_FIELDS, {'txid': None})
+        get_txid = getters['txid']
+        get_input_total = getters['input_total']
+        get_output_total = getters['output_total']
+        get_status = getters['status']
+        get_confirmations = getters['confirmations']
+        
         for tx in transactions:
-            tx_id = None
             tx_type = "Unknown"
             amount = 0
             status = "Unknown"
             
             # Try to get transaction ID
-            for attr in ['txid', 'hash', 'tx_hash', 'id']:
-                if hasattr(tx, attr):
-                    tx_id = getattr(tx, attr)
-                    break
+            tx_id = get_txid(tx)
             
             # Try to get transaction type
-            if hasattr(tx, 'input_total') and hasattr(tx, 'output_total'):
-                if tx.input_total > tx.output_total:
+            if get_input_total and get_output_total:
+                input_total = get_input_total(tx)
+                output_total = get_output_total(tx)
+                if input_total is None or output_total is None:
+                    pass
+                elif input_total > output_total:
                     tx_type = "Outgoing"
-                    amount = -(tx.input_total - tx.output_total)
+                    amount = -(input_total - output_total)
                 else:
                     tx_type = "Incoming"
-                    amount = tx.output_total - tx.input_total
+                    amount = output_total - input_total
             
             # Try to get status
-            if hasattr(tx, 'status'):
-                status = tx.status
-            elif hasattr(tx, 'confirmations'):
-                status = "Confirmed" if tx.confirmations > 0 else "Pending"
+            if get_status:
+                status = get_status(tx)
+            elif get_confirmations:
+                status = "Confirmed" if get_confirmations(tx) > 0 else "Pending"
             
-            print(f"{tx_id or 'Unknown':<65} {tx_type:<8} {amount / 1e8:>14.8f} {status}")
+            rows.append(f"{tx_id or 'Unknown':<65} {tx_type:<8} {_fmt_btc(amount):>14} {status}")
     
     except Exception as e:
-        print(f"Error retrieving transaction history: {e}")
+        rows.append(f"Error retrieving transaction history: {e}")
     
-    print("-" * 80)
+    rows.append("-" * 80)
+    table_logger.info("\n".join(rows))
+
+def parse_arguments():
+    """
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(description='Bitcoin Wallet Recovery Tool')
+    parser.add_argument('--no-tables', action='store_true',
+                        help='Skip the address, UTXO and transaction tables')
+    return parser.parse_args()
 
 def main():
+    args = parse_arguments()
+    if args.no_tables:
+        table_logger.setLevel(logging.WARNING)
+    
     print("\nBitcoin Wallet Recovery Tool")
     print("===========================\n")
     
@@ -376,6 +560,25 @@ def main():
     if not wallet_name:
         wallet_name = "forwarding_wallet"
     
+    # Collect and validate the destination before opening the wallet, so a
+    # mistyped address fails before any network I/O
+    send_funds = input("Send funds from this wallet? (y/n): ").lower().strip() == 'y'
+    to_address = None
+    if send_funds:
+        print("\nTo send funds, please provide the following information:")
+        to_address = input("Destination Bitcoin address: ").strip()
+        if not to_address:
+            print("No destination address given. Exiting.")
+            sys.exit(0)
+        
+        # Validate address
+        try:
+            from bitcoinlib.keys import Address
+            Address.parse(to_address)
+        except Exception as e:
+            print(f"Invalid Bitcoin address: {e}")
+            sys.exit(1)
+    
     # Open wallet
     wallet = open_wallet(wallet_name)
     if not wallet:
@@ -383,40 +586,38 @@ def main():
         sys.exit(1)
     
     # Display wallet info
-    display_wallet_info(wallet)
-    
-    # Display recent transactions
-    display_wallet_transactions(wallet)
+    balance = display_wallet_info(wallet)
+    
+    # Transaction history needs a full scan, since open_wallet only refreshed
+    # the UTXOs, so only fetch it on request
+    show_history = 'n'
+    if table_logger.isEnabledFor(logging.INFO):
+        show_history = input("\nShow transaction history? This requires a full wallet scan (y/n): ").lower().strip()
+    if show_history == 'y':
+        display_wallet_transactions(wallet, scanned=False)
+        # The full scan may have found new funds or spends
+        balance = wallet.balance()
+    
+    if not send_funds:
+        sys.exit(0)
     
     # Check if wallet has balance
-    if wallet.balance() <= 0:
+    if balance <= 0:
         print("\nWallet has zero balance. No funds to recover.")
         sys.exit(0)
     
-    # Ask for destination address
-    print("\nTo send funds, please provide the following information:")
-    to_address = input("Destination Bitcoin address: ")
-    
-    # Validate address
-    try:
-        from bitcoinlib.keys import Address
-        Address.parse(to_address)
-    except Exception as e:
-        print(f"Invalid Bitcoin address: {e}")
-        sys.exit(1)
-    
-    # Ask for amount (optional)
+    # Ask for amount (optional), now that the balance has been shown
     amount_input = input("Amount to send in BTC (leave blank to send entire balance): ")
     amount = None
     if amount_input:
         try:
-            amount = int(float(amount_input) * 1e8)  # Convert to satoshis
+            amount = int(Decimal(amount_input) * SATOSHI_PER_BTC)  # Convert to satoshis exactly
         except:
             print("Invalid amount")
             sys.exit(1)
     
     # Send transaction
-    send_transaction(wallet, to_address, amount)
+    send_transaction(wallet, to_address, amount, balance=balance)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file